@@ -0,0 +1,60 @@
+"""
+Profile sync benchmark
+----------------------
+Builds a large bookmark profile, syncs it once with a local stand-in
+sync server, then edits a single bookmark and reports how many bytes
+and how much time the incremental sync takes.
+
+Usage:
+    python -m benchmarks.bench_profile_sync [--bookmarks 100000] [--disk]
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+
+from browser.core.profile_sync import HttpPeer, SyncServer, SyncStore, sync_stores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bookmarks", type=int, default=100_000)
+    parser.add_argument("--disk", action="store_true", help="keep the local profile on disk")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        local = SyncStore(tmp if args.disk else None)
+        started = time.perf_counter()
+        with local.batch():
+            for i in range(args.bookmarks):
+                url = f"https://site{i}.test/"
+                local.put("bookmarks", url, {"url": url, "title": f"Site {i}"})
+        local.root("bookmarks")
+        print(f"profile built:     {args.bookmarks} bookmarks in {time.perf_counter() - started:.2f} s")
+
+        server = SyncServer(SyncStore())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        peer = HttpPeer(server.url)
+        started = time.perf_counter()
+        sync_stores(local, peer)
+        print(f"initial sync:      {(peer.bytes_sent + peer.bytes_received) / 1024:.0f} KB "
+              f"in {time.perf_counter() - started:.2f} s")
+
+        local.put("bookmarks", "https://site42.test/", {"url": "https://site42.test/", "title": "Edited"})
+
+        peer = HttpPeer(server.url)
+        started = time.perf_counter()
+        stats = sync_stores(local, peer)
+        elapsed = time.perf_counter() - started
+        print(f"incremental sync:  {peer.bytes_sent + peer.bytes_received} bytes, "
+              f"{stats['requests']} requests, {elapsed * 1000:.1f} ms, "
+              f"{stats['pushed']} pushed / {stats['pulled']} pulled")
+
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
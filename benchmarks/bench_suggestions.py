@@ -0,0 +1,89 @@
+"""
+Search suggestion benchmark
+---------------------------
+Types a set of queries into a SuggestionProvider backed by a local
+stand-in suggestion server with injected latency, then reports
+suggestion latency and how many requests were saved compared to
+sending one request per keystroke.
+
+Usage:
+    python -m benchmarks.bench_suggestions [--latency 0.1] [--keystroke 0.08]
+"""
+
+import argparse
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+
+from browser.core.suggestions import SuggestionProvider
+
+QUERIES = [
+    "neodymium magnet",
+    "network drive",
+    "neodymium price",
+    "python tutorial",
+    "pyqt5 webengine",
+    "neodymium magnet",
+    "news today",
+]
+
+WORDS = sorted({q[:end] + suffix for q in QUERIES for end in range(1, len(q) + 1)
+                for suffix in ("", " online", " 2026")})
+
+
+def start_server(latency: float):
+    requests = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)["q"][0]
+            requests.append(query)
+            time.sleep(latency)
+            body = json.dumps([query, [w for w in WORDS if w.startswith(query)][:10]]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.1, help="server latency in seconds")
+    parser.add_argument("--keystroke", type=float, default=0.08, help="delay between keystrokes")
+    args = parser.parse_args()
+
+    server, requests = start_server(args.latency)
+    url = f"http://127.0.0.1:{server.server_address[1]}/?q={{query}}"
+    provider = SuggestionProvider(url, lambda text, suggestions: None, server_limit=10)
+
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            provider.request(query[:end])
+            time.sleep(args.keystroke)
+        time.sleep(provider.debounce + args.latency * 2)
+
+    provider.shutdown()
+    server.shutdown()
+
+    stats = provider.stats()
+    print(f"server latency:      {args.latency * 1000:.0f} ms")
+    print(f"keystrokes:          {stats['keystrokes']}")
+    print(f"requests sent:       {stats['requests_sent']} (server saw {len(requests)})")
+    print(f"requests saved:      {stats['requests_saved']}")
+    print(f"cache hits:          {stats['cache_hits']}")
+    print(f"latency mean:        {stats['latency_mean_ms']:.1f} ms")
+    print(f"latency p50 / p95:   {stats['latency_p50_ms']:.1f} / {stats['latency_p95_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
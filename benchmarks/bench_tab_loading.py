@@ -0,0 +1,137 @@
+"""
+Tab loading benchmark
+---------------------
+Measures time-to-interactive of the foreground tab while other tabs are
+still pending, with and without the tab load scheduler.
+
+Every page is served by a local stand-in server with injected latency,
+and the server only handles a few responses at a time to model a shared
+network link. Time-to-interactive is taken as the foreground page's
+load event (QWebEngineView.loadFinished). The browser runs on a
+throwaway profile with about:blank as homepage, so nothing is fetched
+from outside and the user's own profile is left alone.
+
+Usage:
+    python -m benchmarks.bench_tab_loading [--pending 1 20 100] [--latency 0.05]
+"""
+
+import argparse
+import http.server
+import json
+import os
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from browser.core.window import BrowserWindow  # noqa: E402
+
+ASSETS_PER_PAGE = 4
+
+
+def start_server(latency: float, slots: int):
+    link = threading.Semaphore(slots)
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            with link:
+                time.sleep(latency)
+            if self.path.startswith("/asset/"):
+                body = b"/* asset */" + b" " * 20_000
+                content_type = "text/css"
+            else:
+                links = "".join(
+                    f'<link rel="stylesheet" href="/asset{self.path}/{k}.css">'
+                    for k in range(ASSETS_PER_PAGE)
+                )
+                body = f"<html><head>{links}</head><body>{self.path}</body></html>".encode()
+                content_type = "text/html"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def wait_for_load(view, timeout_ms: int) -> bool:
+    loop = QEventLoop()
+    finished = []
+    view.loadFinished.connect(lambda ok: (finished.append(ok), loop.quit()))
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec_()
+    return bool(finished)
+
+
+def measure(base_url: str, pending: int, scheduled: bool, run: int, timeout_ms: int) -> float | None:
+    window = BrowserWindow()
+    if not scheduled:
+        window.load_scheduler.max_background = 10 ** 6
+        window.load_scheduler.max_background_while_active = 10 ** 6
+
+    window.open_tabs([f"{base_url}/page/{run}/{i}" for i in range(pending)])
+
+    started = time.perf_counter()
+    view = window.new_tab(f"{base_url}/page/{run}/foreground")
+    loaded = wait_for_load(view, timeout_ms)
+    elapsed = time.perf_counter() - started
+
+    window.close()
+    window.deleteLater()
+    QApplication.processEvents()
+    return elapsed if loaded else None
+
+
+def use_temporary_profile() -> tempfile.TemporaryDirectory:
+    """
+    Points HOME at an empty profile whose homepage is about:blank.
+    """
+    home = tempfile.TemporaryDirectory()
+    os.environ["HOME"] = home.name
+    os.makedirs(os.path.join(home.name, ".neodynium"))
+    with open(os.path.join(home.name, ".neodynium", "settings.json"), "w") as f:
+        json.dump({"homepage": "about:blank", "search_engine": "google", "theme": "light"}, f)
+    return home
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pending", type=int, nargs="+", default=[1, 20, 100])
+    parser.add_argument("--latency", type=float, default=0.05, help="per-response latency")
+    parser.add_argument("--slots", type=int, default=8, help="responses served concurrently")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds per measurement")
+    args = parser.parse_args()
+
+    app = QApplication([])  # noqa: F841
+    server = start_server(args.latency, args.slots)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    home = use_temporary_profile()
+
+    print(f"{'pending':>8} {'scheduled':>12} {'unscheduled':>12}")
+    run = 0
+    for pending in args.pending:
+        results = []
+        for scheduled in (True, False):
+            run += 1
+            elapsed = measure(base_url, pending, scheduled, run, int(args.timeout * 1000))
+            results.append("timeout" if elapsed is None else f"{elapsed * 1000:.0f} ms")
+        print(f"{pending:>8} {results[0]:>12} {results[1]:>12}")
+
+    server.shutdown()
+    home.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ The BrowserEngine is responsible for:
 - Search engine handling (future)
 - Integration with settings
 - Providing hooks for extensions
+- Incremental profile sync
 - Acting as a central logic layer between the UI and the browser backend
 """
 
@@ -16,6 +17,10 @@ import re
 import logging
 import json
 import os
+import time
+
+from .profile_sync import SyncStore, apply_store_to_engine, sync_stores, update_store_from_engine
+from .suggestions import SuggestionProvider
 
 
 class BrowserEngine:
@@ -27,13 +32,15 @@ class BrowserEngine:
     def __init__(self, settings: dict | None = None):
         """
         Initialize the engine with optional settings.
-        If settings are missing, defaults are used.
+        If settings are missing, the saved ones or defaults are used.
         """
         self.settings = settings or {
             "homepage": "https://www.google.com",
             "search_engine": "google",
             "theme": "light"
         }
+        if settings is None:
+            self.load_settings()
 
         # Predefined search engines (expandable)
         self.search_engines = {
@@ -42,11 +49,31 @@ class BrowserEngine:
             "bing": "https://www.bing.com/search?q={query}"
         }
 
+        # Suggestion endpoints (OpenSearch JSON format). "limit" is the
+        # most suggestions the engine returns; only shorter answers are
+        # known to be complete and can be reused for longer prefixes.
+        self.suggestion_engines = {
+            "google": {
+                "url": "https://suggestqueries.google.com/complete/search?client=firefox&q={query}",
+                "limit": 10
+            },
+            "duckduckgo": {
+                "url": "https://duckduckgo.com/ac/?q={query}&type=list",
+                "limit": 8
+            },
+            "bing": {
+                "url": "https://api.bing.com/osjson.aspx?query={query}",
+                "limit": 8
+            }
+        }
+
         logging.info("BrowserEngine initialized with settings: %s", self.settings)
 
         # Initialize bookmarks and history
         self.bookmarks = []
         self.history = []
+        self.max_history = 100
+        self.sync_store = None
         self.load_bookmarks()
         self.load_history()
 
@@ -113,6 +140,52 @@ class BrowserEngine:
         logging.info("Search URL built: %s", url)
         return url
 
+    def create_suggestion_provider(self, callback) -> SuggestionProvider | None:
+        """
+        Creates a suggestion provider for the selected search engine.
+        callback(text, suggestions) is called from a worker thread.
+        Returns None if the engine has no suggestion endpoint.
+        """
+        engine = self.settings.get("search_engine", "google")
+        if engine not in self.search_engines:
+            engine = "google"
+
+        endpoint = self.suggestion_engines.get(engine)
+
+        if endpoint is None:
+            logging.warning("No search suggestions available for '%s'", engine)
+            return None
+
+        return SuggestionProvider(endpoint["url"], callback, server_limit=endpoint.get("limit"))
+
+    # ------------------------------------------------------------
+    # Settings
+    # ------------------------------------------------------------
+
+    def load_settings(self):
+        """
+        Loads settings from file.
+        """
+        settings_file = os.path.join(os.path.expanduser("~"), ".neodynium", "settings.json")
+        if os.path.exists(settings_file):
+            try:
+                with open(settings_file, 'r') as f:
+                    self.settings = json.load(f)
+            except Exception as e:
+                logging.error("Failed to load settings: %s", e)
+
+    def save_settings(self):
+        """
+        Saves settings to file.
+        """
+        settings_file = os.path.join(os.path.expanduser("~"), ".neodynium", "settings.json")
+        os.makedirs(os.path.dirname(settings_file), exist_ok=True)
+        try:
+            with open(settings_file, 'w') as f:
+                json.dump(self.settings, f)
+        except Exception as e:
+            logging.error("Failed to save settings: %s", e)
+
     # ------------------------------------------------------------
     # Bookmarks Management
     # ------------------------------------------------------------
@@ -170,11 +243,11 @@ class BrowserEngine:
 
     def add_to_history(self, url: str):
         """
-        Adds a URL to history.
+        Adds a URL to history with its visit time.
         """
-        if not self.history or self.history[-1] != url:
-            self.history.append(url)
-            if len(self.history) > 100:  # Limit history size
+        if not self.history or self.history[-1]['url'] != url:
+            self.history.append({'url': url, 'visited': time.time()})
+            if len(self.history) > self.max_history:  # Limit history size
                 self.history.pop(0)
             self.save_history()
             logging.info("Added to history: %s", url)
@@ -201,7 +274,11 @@ class BrowserEngine:
         if os.path.exists(history_file):
             try:
                 with open(history_file, 'r') as f:
-                    self.history = json.load(f)
+                    # Older profiles stored plain URLs without visit times
+                    self.history = [
+                        entry if isinstance(entry, dict) else {'url': entry, 'visited': 0}
+                        for entry in json.load(f)
+                    ]
             except Exception as e:
                 logging.error("Failed to load history: %s", e)
 
@@ -217,6 +294,39 @@ class BrowserEngine:
         except Exception as e:
             logging.error("Failed to save history: %s", e)
 
+    # ------------------------------------------------------------
+    # Profile Sync
+    # ------------------------------------------------------------
+
+    def get_sync_store(self) -> SyncStore:
+        """
+        Returns the profile's sync record store, loading it on first use.
+        """
+        if self.sync_store is None:
+            sync_dir = os.path.join(os.path.expanduser("~"), ".neodynium", "sync")
+            self.sync_store = SyncStore(sync_dir)
+        return self.sync_store
+
+    def sync_profile(self, peer) -> dict:
+        """
+        Syncs bookmarks, history and settings with a peer
+        (LocalPeer or HttpPeer). Returns sync statistics.
+        """
+        store = self.get_sync_store()
+
+        # Peers may have pushed records into the store since last time
+        received = store.seq > store.exported_seq
+
+        update_store_from_engine(store, self)
+        stats = sync_stores(store, peer)
+
+        # Nothing new arrived: skip rewriting the profile files
+        if received or stats["pulled"]:
+            apply_store_to_engine(store, self)
+        else:
+            store.mark_exported()
+        return stats
+
     # ------------------------------------------------------------
     # Extension Hooks
     # ------------------------------------------------------------
@@ -9,13 +9,17 @@ Extensions live in:
 Each extension must contain:
     extension.py  -> defines a class named Extension
 
-This manager dynamically imports and initializes them.
+This manager dynamically imports and initializes them, and installs
+new extensions from the extension store.
 """
 
 import os
+import sys
 import importlib
 import logging
 
+from .extension_store import DEFAULT_STORE_URL, ExtensionStoreClient, ExtensionStoreError
+
 
 class ExtensionManager:
     """
@@ -25,6 +29,9 @@ class ExtensionManager:
     def __init__(self, window):
         self.window = window
         self.extensions = []
+        self.extension_paths = {}
+        self.loaded = {}
+        self.store = None
         self.extensions_path = os.path.join(
             os.path.dirname(os.path.dirname(__file__)),
             "extensions"
@@ -45,34 +52,103 @@ class ExtensionManager:
             return
 
         for folder in os.listdir(self.extensions_path):
-            ext_dir = os.path.join(self.extensions_path, folder)
-            ext_file = os.path.join(ext_dir, "extension.py")
+            self._load_extension(folder)
+
+    def _load_extension(self, folder: str):
+        """
+        Imports and initializes a single extension folder.
+        """
+        ext_dir = os.path.join(self.extensions_path, folder)
+        ext_file = os.path.join(ext_dir, "extension.py")
 
-            if not os.path.isdir(ext_dir):
-                continue
-            if not os.path.exists(ext_file):
-                continue
+        if not os.path.isdir(ext_dir):
+            return
+        if not os.path.exists(ext_file):
+            return
 
-            module_name = f"browser.extensions.{folder}.extension"
+        module_name = f"browser.extensions.{folder}.extension"
 
-            try:
+        # Reinstalled or updated: replace the running instance and code
+        if folder in self.loaded:
+            self._unload_extension(folder)
+
+        try:
+            if module_name in sys.modules:
+                module = importlib.reload(sys.modules[module_name])
+            else:
                 module = importlib.import_module(module_name)
-                if not hasattr(module, "Extension"):
-                    logging.error("Extension '%s' missing Extension class", folder)
-                    continue
+            if not hasattr(module, "Extension"):
+                logging.error("Extension '%s' missing Extension class", folder)
+                return
 
-                ext_class = module.Extension
-                ext_instance = ext_class(self.window)
+            ext_class = module.Extension
+            ext_instance = ext_class(self.window)
 
-                self.extensions.append(ext_instance)
-                logging.info("Loaded extension: %s", folder)
+            self.extensions.append(ext_instance)
+            self.extension_paths[folder] = ext_dir
+            self.loaded[folder] = ext_instance
+            logging.info("Loaded extension: %s", folder)
 
-                # Call optional hook
-                if hasattr(ext_instance, "on_load"):
-                    ext_instance.on_load()
+            # Call optional hook
+            if hasattr(ext_instance, "on_load"):
+                ext_instance.on_load()
 
+        except Exception as e:
+            logging.error("Failed to load extension '%s': %s", folder, e)
+
+    def _unload_extension(self, folder: str):
+        """
+        Removes a loaded extension instance.
+        """
+        ext_instance = self.loaded.pop(folder)
+        self.extensions.remove(ext_instance)
+        self.extension_paths.pop(folder, None)
+
+        # Call optional hook
+        if hasattr(ext_instance, "on_unload"):
+            try:
+                ext_instance.on_unload()
             except Exception as e:
-                logging.error("Failed to load extension '%s': %s", folder, e)
+                logging.error("Extension '%s' on_unload failed: %s", folder, e)
+
+        logging.info("Unloaded extension: %s", folder)
+
+    # ------------------------------------------------------------
+    # Extension Store
+    # ------------------------------------------------------------
+
+    def get_store(self) -> ExtensionStoreClient:
+        """
+        Returns the extension store client, creating it on first use
+        and refreshing its catalog when the cached copy is stale.
+        """
+        if self.store is None:
+            settings = getattr(getattr(self.window, "engine", None), "settings", {})
+            store_url = settings.get("extension_store_url", DEFAULT_STORE_URL)
+            self.store = ExtensionStoreClient(store_url)
+
+        if self.store.is_stale():
+            try:
+                self.store.refresh()
+            except ExtensionStoreError as e:
+                # Fall back to whatever catalog is cached
+                logging.error("Failed to refresh extension store: %s", e)
+
+        return self.store
+
+    def search_store(self, query: str) -> list:
+        """
+        Searches the extension store catalog.
+        """
+        return self.get_store().search(query)
+
+    def install_from_store(self, ext_id: str):
+        """
+        Installs (or updates) an extension from the store and loads it.
+        """
+        self.get_store().install(ext_id, self.extensions_path)
+        importlib.invalidate_caches()
+        self._load_extension(ext_id)
 
     # ------------------------------------------------------------
     # Hooks for future features
@@ -0,0 +1,434 @@
+"""
+ExtensionStore
+--------------
+Client for the public Neodynium extension store.
+
+The store is a set of static files, so it can be served from any plain
+HTTP host (GitHub raw, a CDN, or a local folder during development):
+
+    <store>/index.json                 -> {"revision": N, "snapshot": ..., "oldest_delta": K}
+    <store>/snapshots/<N>.json.gz      -> full catalog at revision N
+    <store>/deltas/<N>.json.gz         -> changes from revision N-1 to N
+    <store>/packages/<id>-<ver>.zip    -> extension packages
+
+A catalog entry looks like:
+
+    {
+        "name": "AdBlocker",
+        "version": "1.0.0",
+        "description": "Blocks common ad domains.",
+        "tags": ["privacy", "ads"],
+        "package": "packages/adblocker-1.0.0.zip",
+        "sha256": "<hex digest of the package>"
+    }
+
+The client keeps the catalog cached on disk and, on refresh, only
+downloads the deltas published since the cached revision. A full
+snapshot is fetched only on first use or when the cache is too old for
+the published deltas.
+"""
+
+import bisect
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zipfile
+
+
+DEFAULT_STORE_URL = "https://raw.githubusercontent.com/Maor-404/neodynium/main/extension_store"
+
+# Above this many pending deltas a fresh snapshot is usually cheaper
+MAX_DELTAS_PER_REFRESH = 50
+
+# Age (seconds) after which the cached catalog is refreshed before use
+CATALOG_MAX_AGE = 6 * 60 * 60
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Search weight of each catalog field
+_FIELD_WEIGHTS = {
+    "name": 3,
+    "tags": 2,
+    "description": 1,
+}
+
+
+class ExtensionStoreError(Exception):
+    """
+    Raised when the store cannot be reached or returns invalid data.
+    """
+
+
+class ExtensionStoreClient:
+    """
+    Fetches, caches and searches the extension store catalog.
+    """
+
+    def __init__(self, store_url: str = DEFAULT_STORE_URL,
+                 cache_dir: str | None = None, timeout: float = 10.0):
+        self.store_url = store_url.rstrip("/") + "/"
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.expanduser("~"), ".neodynium", "extension_store"
+        )
+        self.timeout = timeout
+
+        self.revision = 0
+        self.extensions = {}
+
+        # Wall-clock time of the last successful refresh
+        self.refreshed_at = 0.0
+
+        # Bytes downloaded during the last refresh
+        self.bytes_transferred = 0
+
+        # token -> {extension_id: score}
+        self._index = {}
+        self._tokens = []
+
+        self.load_cache()
+
+    # ------------------------------------------------------------
+    # Networking
+    # ------------------------------------------------------------
+
+    def _fetch(self, path: str) -> bytes:
+        url = urllib.parse.urljoin(self.store_url, path)
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                data = response.read()
+        except (urllib.error.URLError, OSError) as e:
+            raise ExtensionStoreError(f"Failed to fetch {url}: {e}") from e
+
+        self.bytes_transferred += len(data)
+        return data
+
+    def _fetch_json(self, path: str) -> dict:
+        data = self._fetch(path)
+        try:
+            if path.endswith(".gz"):
+                data = gzip.decompress(data)
+            return json.loads(data.decode("utf-8"))
+        except (OSError, ValueError) as e:
+            raise ExtensionStoreError(f"Invalid store data in {path}: {e}") from e
+
+    # ------------------------------------------------------------
+    # Catalog Refresh
+    # ------------------------------------------------------------
+
+    def refresh(self) -> int:
+        """
+        Brings the local catalog up to date with the store.
+        Returns the new catalog revision.
+        """
+        self.bytes_transferred = 0
+        head = self._fetch_json("index.json")
+        latest = int(head.get("revision", 0))
+
+        if latest == self.revision and self.extensions:
+            logging.info("Extension store catalog up to date (revision %s)", latest)
+            self.refreshed_at = time.time()
+            self.save_cache()
+            return self.revision
+
+        oldest_delta = int(head.get("oldest_delta", latest + 1))
+        pending = latest - self.revision
+
+        # The catalog is only replaced once a full update has arrived
+        catalog = None
+        if (self.extensions and 0 < pending <= MAX_DELTAS_PER_REFRESH
+                and self.revision + 1 >= oldest_delta):
+            try:
+                catalog = self._fetch_deltas(latest)
+                logging.info("Applied %s extension store deltas", pending)
+            except ExtensionStoreError as e:
+                if not head.get("snapshot"):
+                    raise
+                logging.warning("Extension store deltas unusable, fetching snapshot: %s", e)
+
+        if catalog is None and head.get("snapshot"):
+            snapshot = self._fetch_json(head["snapshot"])
+            catalog = snapshot.get("extensions", {}), int(snapshot.get("revision", latest))
+            logging.info("Fetched extension store snapshot (revision %s)", catalog[1])
+        elif catalog is None:
+            # Nothing published yet
+            catalog = {}, latest
+
+        self.extensions, self.revision = catalog
+
+        self._build_index()
+        self.refreshed_at = time.time()
+        self.save_cache()
+        logging.info("Extension store refresh downloaded %s bytes", self.bytes_transferred)
+        return self.revision
+
+    def _fetch_deltas(self, latest: int) -> tuple:
+        """
+        Applies the deltas up to latest to a copy of the catalog.
+        Returns (extensions, revision).
+        """
+        extensions = dict(self.extensions)
+        revision = self.revision
+        while revision < latest:
+            delta = self._fetch_json(f"deltas/{revision + 1}.json.gz")
+            next_revision = int(delta.get("revision", -1))
+            if int(delta.get("from", -1)) != revision or next_revision <= revision:
+                raise ExtensionStoreError(
+                    f"Delta {delta.get('revision')} does not follow revision {revision}"
+                )
+
+            for ext_id, entry in delta.get("changes", {}).items():
+                if entry is None:
+                    extensions.pop(ext_id, None)
+                else:
+                    extensions[ext_id] = entry
+            revision = next_revision
+        return extensions, revision
+
+    def is_stale(self, max_age: float = CATALOG_MAX_AGE) -> bool:
+        """
+        Returns True if the catalog was never fetched or is older than max_age.
+        """
+        return time.time() - self.refreshed_at > max_age
+
+    # ------------------------------------------------------------
+    # Disk Cache
+    # ------------------------------------------------------------
+
+    def _cache_file(self) -> str:
+        return os.path.join(self.cache_dir, "catalog.json.gz")
+
+    def load_cache(self):
+        """
+        Loads the cached catalog, if any.
+        """
+        cache_file = self._cache_file()
+        if not os.path.exists(cache_file):
+            return
+
+        try:
+            with gzip.open(cache_file, "rt", encoding="utf-8") as f:
+                cached = json.load(f)
+            self.extensions = cached.get("extensions", {})
+            self.revision = int(cached.get("revision", 0))
+            self.refreshed_at = float(cached.get("refreshed_at", 0.0))
+        except Exception as e:
+            logging.error("Failed to load extension store cache: %s", e)
+            self.extensions = {}
+            self.revision = 0
+
+        self._build_index()
+
+    def save_cache(self):
+        """
+        Writes the catalog to the disk cache.
+        """
+        cache_file = self._cache_file()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_file = cache_file + ".tmp"
+        try:
+            with gzip.open(tmp_file, "wt", encoding="utf-8") as f:
+                json.dump({
+                    "revision": self.revision,
+                    "refreshed_at": self.refreshed_at,
+                    "extensions": self.extensions,
+                }, f)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            logging.error("Failed to save extension store cache: %s", e)
+
+    # ------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------
+
+    def _build_index(self):
+        index = {}
+        for ext_id, entry in self.extensions.items():
+            for field, weight in _FIELD_WEIGHTS.items():
+                value = entry.get(field, "")
+                if isinstance(value, list):
+                    value = " ".join(value)
+                for token in _TOKEN_RE.findall(str(value).lower()):
+                    scores = index.setdefault(token, {})
+                    scores[ext_id] = max(scores.get(ext_id, 0), weight)
+
+        self._index = index
+        self._tokens = sorted(index)
+
+    def _match_prefix(self, prefix: str) -> dict:
+        """
+        Returns {extension_id: score} for every token starting with prefix.
+        """
+        matches = {}
+        start = bisect.bisect_left(self._tokens, prefix)
+        for token in self._tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            exact_bonus = 1 if token == prefix else 0
+            for ext_id, score in self._index[token].items():
+                matches[ext_id] = max(matches.get(ext_id, 0), score + exact_bonus)
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """
+        Searches names, tags and descriptions.
+        Every word of the query must match (as a prefix) for an entry
+        to be returned. Results are ordered by relevance, then name.
+        """
+        words = _TOKEN_RE.findall(query.lower())
+        if not words:
+            return []
+
+        results = None
+        for word in words:
+            matches = self._match_prefix(word)
+            if results is None:
+                results = matches
+            else:
+                results = {
+                    ext_id: score + matches[ext_id]
+                    for ext_id, score in results.items()
+                    if ext_id in matches
+                }
+            if not results:
+                return []
+
+        ranked = sorted(
+            results,
+            key=lambda ext_id: (-results[ext_id], self.extensions[ext_id].get("name", ext_id).lower())
+        )
+        return [dict(self.extensions[ext_id], id=ext_id) for ext_id in ranked[:limit]]
+
+    # ------------------------------------------------------------
+    # Installation
+    # ------------------------------------------------------------
+
+    def install(self, ext_id: str, extensions_path: str) -> str:
+        """
+        Downloads an extension package, verifies its content hash and
+        unpacks it into extensions_path/<ext_id>/.
+        Returns the installed extension directory.
+        """
+        entry = self.extensions.get(ext_id)
+        if entry is None:
+            raise ExtensionStoreError(f"Unknown extension: {ext_id}")
+        if not re.fullmatch(r"[A-Za-z0-9_]+", ext_id):
+            # The folder name becomes a Python package name
+            raise ExtensionStoreError(f"Invalid extension id: {ext_id}")
+
+        data = self._fetch(entry["package"])
+        digest = hashlib.sha256(data).hexdigest()
+        if digest != entry.get("sha256"):
+            raise ExtensionStoreError(
+                f"Hash mismatch for {ext_id}: expected {entry.get('sha256')}, got {digest}"
+            )
+
+        target = os.path.join(extensions_path, ext_id)
+        staging = target + ".installing"
+        shutil.rmtree(staging, ignore_errors=True)
+
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for member in archive.namelist():
+                    path = os.path.realpath(os.path.join(staging, member))
+                    if not path.startswith(os.path.realpath(staging) + os.sep):
+                        raise ExtensionStoreError(f"Unsafe path in package {ext_id}: {member}")
+                archive.extractall(staging)
+        except zipfile.BadZipFile as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise ExtensionStoreError(f"Corrupt package for {ext_id}: {e}") from e
+        except ExtensionStoreError:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if not os.path.exists(os.path.join(staging, "extension.py")):
+            shutil.rmtree(staging, ignore_errors=True)
+            raise ExtensionStoreError(f"Package for {ext_id} has no extension.py")
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+        logging.info("Installed extension '%s' %s", ext_id, entry.get("version", ""))
+        return target
+
+
+# ------------------------------------------------------------
+# Publishing
+# ------------------------------------------------------------
+
+def publish_revision(store_dir: str, extensions: dict) -> int:
+    """
+    Publishes a new catalog revision into a store folder.
+
+    Writes the full snapshot, the delta against the previous revision
+    and an updated index.json. Returns the new revision, or the current
+    one if nothing changed.
+    """
+    index_file = os.path.join(store_dir, "index.json")
+    head = {}
+    if os.path.exists(index_file):
+        with open(index_file, "r", encoding="utf-8") as f:
+            head = json.load(f)
+
+    revision = int(head.get("revision", 0))
+    previous = {}
+    if head.get("snapshot"):
+        with gzip.open(os.path.join(store_dir, head["snapshot"]), "rt", encoding="utf-8") as f:
+            previous = json.load(f).get("extensions", {})
+
+    changes = {
+        ext_id: entry
+        for ext_id, entry in extensions.items()
+        if previous.get(ext_id) != entry
+    }
+    for ext_id in previous:
+        if ext_id not in extensions:
+            changes[ext_id] = None
+
+    if not changes and head.get("snapshot"):
+        return revision
+
+    new_revision = revision + 1
+    snapshot_path = f"snapshots/{new_revision}.json.gz"
+    os.makedirs(os.path.join(store_dir, "snapshots"), exist_ok=True)
+    os.makedirs(os.path.join(store_dir, "deltas"), exist_ok=True)
+
+    with gzip.open(os.path.join(store_dir, snapshot_path), "wt", encoding="utf-8") as f:
+        json.dump({"revision": new_revision, "extensions": extensions}, f)
+
+    if head.get("snapshot"):
+        with gzip.open(os.path.join(store_dir, "deltas", f"{new_revision}.json.gz"), "wt",
+                       encoding="utf-8") as f:
+            json.dump({"from": revision, "revision": new_revision, "changes": changes}, f)
+
+    old_snapshot = head.get("snapshot")
+    if old_snapshot:
+        oldest_delta = int(head.get("oldest_delta", new_revision))
+    else:
+        oldest_delta = new_revision + 1
+
+    head = {
+        "revision": new_revision,
+        "snapshot": snapshot_path,
+        "oldest_delta": oldest_delta,
+    }
+    # Swap the index in atomically so clients never see a partial file
+    tmp_file = index_file + ".tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(head, f, indent=2)
+    os.replace(tmp_file, index_file)
+
+    # Only now is the previous snapshot unreferenced
+    if old_snapshot and old_snapshot != snapshot_path:
+        old_path = os.path.join(store_dir, old_snapshot)
+        if os.path.exists(old_path):
+            os.remove(old_path)
+
+    return new_revision
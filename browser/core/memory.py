@@ -0,0 +1,280 @@
+"""
+MemoryMonitor
+-------------
+Answers "which tab or extension is eating memory?".
+
+- Tabs are mapped to their renderer process through
+  QWebEnginePage.renderProcessPid(), and each renderer's RSS/PSS is read
+  from /proc. Several tabs can share one renderer; they are reported
+  together under that process.
+- Extensions run inside the browser process, so their usage is measured
+  with tracemalloc: Python heap growth is attributed to an extension
+  when its folder appears in the allocation traceback.
+
+Samples are kept as a bounded time series and exposed through the
+about:memory page and a JSON dump. Extension tracking is costly (every
+sample takes a tracemalloc snapshot), so the window only keeps it on
+while about:memory is shown or the memory_tracking setting is set. Only
+memory allocated after tracking starts is counted; the setting starts it
+before extensions load.
+"""
+
+import html
+import json
+import logging
+import os
+import time
+import tracemalloc
+from collections import deque
+
+
+# Frames kept per allocation, so calls into the stdlib are still
+# attributed to the extension that made them
+TRACEMALLOC_FRAMES = 25
+
+# Fewer frames for tracking that runs the whole session (memory_tracking
+# setting), which starts before extensions load
+SESSION_TRACEMALLOC_FRAMES = 8
+
+
+def read_process_memory(pid: int) -> dict | None:
+    """
+    Returns {"rss": bytes, "pss": bytes or None} for a process,
+    or None if /proc is unavailable or the process is gone.
+    """
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    values[key.lower()] = int(rest.split()[0]) * 1024
+    except (OSError, ValueError):
+        # Older kernels have no smaps_rollup; fall back to RSS only
+        try:
+            with open(f"/proc/{pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        values["rss"] = int(line.split()[1]) * 1024
+                        break
+        except (OSError, ValueError):
+            return None
+
+    if "rss" not in values:
+        return None
+
+    values.setdefault("pss", None)
+    return values
+
+
+class MemoryMonitor:
+    """
+    Samples per-tab and per-extension memory usage.
+    """
+
+    def __init__(self, window, history: int = 120):
+        self.window = window
+        self.history = history
+
+        # name -> deque of (timestamp, bytes)
+        self.series = {}
+        self.latest = {}
+        self._sampled_at = 0.0
+
+        # Extensions are only sampled while tracking is switched on
+        self.tracking = False
+        self.tracking_since = None
+        self._started_tracemalloc = False
+        self._baseline = {}
+
+    # ------------------------------------------------------------
+    # Extension Tracking
+    # ------------------------------------------------------------
+
+    def start_extension_tracking(self, frames: int = TRACEMALLOC_FRAMES):
+        """
+        Starts tracemalloc so extension heap growth can be measured.
+        Only allocations made after this call are attributed, so call it
+        before extensions load to count their whole heap.
+        """
+        if self.tracking:
+            return
+
+        # Someone else (e.g. python -X tracemalloc) may already be tracing
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._started_tracemalloc = True
+        self._baseline = self._extension_usage(tracemalloc.take_snapshot())
+        self.tracking = True
+        self.tracking_since = time.time()
+        logging.info("Extension memory tracking started")
+
+    def stop_extension_tracking(self):
+        """
+        Stops extension sampling, and tracemalloc if it was started here.
+        """
+        if not self.tracking:
+            return
+
+        if self._started_tracemalloc and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracemalloc = False
+        self.tracking = False
+        self.tracking_since = None
+        self._baseline = {}
+        logging.info("Extension memory tracking stopped")
+
+    def _extension_usage(self, snapshot) -> dict:
+        usage = {}
+        paths = getattr(self.window.extension_manager, "extension_paths", {})
+        for name, path in paths.items():
+            pattern = os.path.join(path, "*")
+            filtered = snapshot.filter_traces([tracemalloc.Filter(True, pattern, all_frames=True)])
+            usage[name] = sum(stat.size for stat in filtered.statistics("filename"))
+        return usage
+
+    # ------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------
+
+    def _record(self, name: str, value: int):
+        series = self.series.get(name)
+        if series is None:
+            series = self.series[name] = deque(maxlen=self.history)
+        series.append((self._sampled_at, value))
+
+    def _tab_processes(self) -> dict:
+        """
+        Returns {renderer_pid: [{"index", "title", "url"}, ...]}.
+        """
+        processes = {}
+        tabs = self.window.tabs
+        for index in range(tabs.count()):
+            view = tabs.widget(index)
+            page = view.page()
+            # renderProcessPid() needs Qt 5.15+
+            pid = page.renderProcessPid() if hasattr(page, "renderProcessPid") else 0
+            if not pid:
+                continue
+            processes.setdefault(pid, []).append({
+                "index": index,
+                "title": tabs.tabText(index),
+                "url": view.url().toString(),
+            })
+        return processes
+
+    def sample(self) -> dict:
+        """
+        Takes one sample of every tab renderer, the browser process and
+        (if tracking is on) every extension.
+        """
+        self._sampled_at = time.time()
+        sample = {"timestamp": self._sampled_at, "browser": None, "renderers": [], "extensions": {}}
+
+        browser = read_process_memory(os.getpid())
+        if browser is not None:
+            sample["browser"] = browser
+            self._record("browser", browser["pss"] or browser["rss"])
+
+        for pid, tabs in self._tab_processes().items():
+            usage = read_process_memory(pid)
+            if usage is None:
+                continue
+            sample["renderers"].append(dict(usage, pid=pid, tabs=tabs))
+            self._record(f"renderer:{pid}", usage["pss"] or usage["rss"])
+
+        if self.tracking:
+            usage = self._extension_usage(tracemalloc.take_snapshot())
+            for name, size in usage.items():
+                growth = size - self._baseline.get(name, 0)
+                sample["extensions"][name] = {"allocated": size, "growth": growth}
+                self._record(f"extension:{name}", size)
+
+        # Forget processes that no longer exist
+        live = {"browser"} | {f"renderer:{r['pid']}" for r in sample["renderers"]}
+        for name in list(self.series):
+            if name.startswith("renderer:") and name not in live:
+                del self.series[name]
+
+        self.latest = sample
+        return sample
+
+    # ------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "latest": self.latest,
+            "series": {name: list(points) for name, points in self.series.items()},
+        }
+
+    def dump_json(self, path: str):
+        """
+        Writes the latest sample and all time series to a JSON file.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=2)
+            logging.info("Memory report written to %s", path)
+        except Exception as e:
+            logging.error("Failed to write memory report: %s", e)
+
+    def render_html(self) -> str:
+        """
+        Renders the about:memory page.
+        """
+        sample = self.latest or self.sample()
+        rows = []
+        extension_rows = []
+
+        def mb(value):
+            return "-" if value is None else f"{value / (1024 * 1024):.1f} MB"
+
+        def trend(name):
+            points = self.series.get(name, ())
+            return " ".join(mb(value).split()[0] for _, value in list(points)[-10:])
+
+        if sample["browser"]:
+            rows.append(("Browser process", mb(sample["browser"]["rss"]),
+                         mb(sample["browser"]["pss"]), trend("browser")))
+
+        for renderer in sorted(sample["renderers"], key=lambda r: -(r["pss"] or r["rss"])):
+            titles = ", ".join(html.escape(tab["title"] or tab["url"]) for tab in renderer["tabs"])
+            rows.append((f"Renderer {renderer['pid']}: {titles}", mb(renderer["rss"]),
+                         mb(renderer["pss"]), trend(f"renderer:{renderer['pid']}")))
+
+        for name, usage in sorted(sample["extensions"].items(), key=lambda e: -e[1]["allocated"]):
+            extension_rows.append((html.escape(name), mb(usage["allocated"]),
+                                   trend(f"extension:{name}")))
+
+        if self.tracking:
+            since = time.strftime('%H:%M:%S', time.localtime(self.tracking_since))
+            note = (f"<p>Extension numbers only count memory allocated since tracking "
+                    f"started at {since}. Set memory_tracking in settings to track "
+                    "from startup.</p>")
+        else:
+            note = "<p>Extension tracking is off.</p>"
+
+        body = "\n".join(
+            f"<tr><td>{label}</td><td>{rss}</td><td>{pss}</td><td>{history}</td></tr>"
+            for label, rss, pss, history in rows
+        )
+        extension_body = "\n".join(
+            f"<tr><td>{label}</td><td>{allocated}</td><td>{history}</td></tr>"
+            for label, allocated, history in extension_rows
+        )
+        return (
+            "<html><head><title>Memory</title></head><body>"
+            "<h1>Memory usage</h1>"
+            f"<p>Sampled {time.strftime('%H:%M:%S', time.localtime(sample['timestamp']))}</p>"
+            "<table border='1' cellpadding='4'>"
+            "<tr><th>Process</th><th>RSS</th><th>PSS</th><th>Recent (MB)</th></tr>"
+            f"{body}</table>"
+            "<h2>Extensions</h2>"
+            f"{note}"
+            "<table border='1' cellpadding='4'>"
+            "<tr><th>Extension</th><th>Allocated since tracking started</th><th>Recent (MB)</th></tr>"
+            f"{extension_body}</table></body></html>"
+        )
@@ -0,0 +1,677 @@
+"""
+ProfileSync
+-----------
+Incremental sync of profile data (bookmarks, history and settings).
+
+Instead of copying whole JSON files, every bookmark, history entry and
+setting is stored as its own record in a SyncStore:
+
+    entry = {"value": ..., "hash": <content hash>, "clock": n, "device": id, "deleted": bool}
+
+- Every local change bumps a Lamport clock and is appended, with its
+  content hash, to a change log on disk.
+- Records are grouped into a fixed-depth hash tree (Merkle-style
+  summary) keyed by a hash of the record key. Two stores compare the
+  tree level by level and only descend into branches that differ, so a
+  single edit in a 100k-record profile costs a handful of small
+  requests.
+- Conflicts are resolved deterministically: the entry with the higher
+  (clock, device, hash) wins on both sides.
+
+Peers can be another store on disk (LocalPeer) or a remote store behind
+the small HTTP sync server in this module (HttpPeer / SyncServer).
+"""
+
+import contextlib
+import copy
+import hashlib
+import http.server
+import json
+import logging
+import os
+import threading
+import urllib.error
+import urllib.request
+import uuid
+
+
+COLLECTIONS = ("bookmarks", "history", "settings")
+
+# Hex digits of the key hash used as tree path (fanout 16 per level)
+TREE_DEPTH = 4
+
+# Length of the hashes exchanged between peers
+HASH_LENGTH = 16
+
+# Change log lines kept before they are folded into the snapshot
+MAX_LOG_LINES = 10_000
+
+
+class SyncError(Exception):
+    """
+    Raised when a sync peer cannot be reached or misbehaves.
+    """
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:HASH_LENGTH]
+
+
+def content_hash(value) -> str:
+    """
+    Returns a stable hash of a JSON-serializable value.
+    """
+    return _hash(json.dumps(value, sort_keys=True, separators=(",", ":")))
+
+
+def _version(entry: dict) -> list:
+    return [entry["clock"], entry["device"], entry["hash"] if not entry["deleted"] else ""]
+
+
+class SyncStore:
+    """
+    Record store of one profile, with change log and hash tree.
+    """
+
+    def __init__(self, path: str | None = None, device_id: str | None = None):
+        self.path = path
+        self.device_id = device_id
+        self.clock = 0
+
+        # collection -> {key: entry}
+        self.records = {c: {} for c in COLLECTIONS}
+
+        # collection -> {leaf prefix: {key: version string}}
+        self._leaves = {c: {} for c in COLLECTIONS}
+
+        # collection -> set of every non-empty tree prefix
+        self._prefixes = {c: {""} for c in COLLECTIONS}
+
+        # (collection, prefix) -> node hash
+        self._node_cache = {}
+
+        # Local sequence number of the last write to each record, and
+        # the sequence the browser engine has seen up to
+        self.seq = 0
+        self.seqs = {c: {} for c in COLLECTIONS}
+        self.exported_seq = 0
+
+        self._log_lines = 0
+        # Set when the log ends in a line torn by a crash mid-append
+        self._log_torn = False
+        self._pending_log = []
+        self._batch_depth = 0
+        self._lock = threading.RLock()
+
+        if path:
+            self.load()
+
+        if self.device_id is None:
+            self.device_id = uuid.uuid4().hex[:12]
+
+        # Persist the device id of a new profile
+        if path and not os.path.exists(self._snapshot_file()):
+            self.compact()
+
+    # ------------------------------------------------------------
+    # Local Changes
+    # ------------------------------------------------------------
+
+    def put(self, collection: str, key: str, value) -> bool:
+        """
+        Sets a record. Returns False if the content did not change.
+        """
+        with self._lock:
+            current = self.records[collection].get(key)
+            if current is not None and not current["deleted"] and current["value"] == value:
+                return False
+
+            self.clock += 1
+            # Copied so later edits by the caller can't change the record
+            entry = {"value": copy.deepcopy(value), "hash": content_hash(value), "clock": self.clock,
+                     "device": self.device_id, "deleted": False}
+            self._set(collection, key, entry)
+            self._log_changes([(collection, key, entry)])
+            return True
+
+    def delete(self, collection: str, key: str) -> bool:
+        """
+        Deletes a record, leaving a tombstone so the deletion syncs.
+        """
+        with self._lock:
+            current = self.records[collection].get(key)
+            if current is None or current["deleted"]:
+                return False
+
+            self.clock += 1
+            entry = {"value": None, "hash": current["hash"], "clock": self.clock,
+                     "device": self.device_id, "deleted": True}
+            self._set(collection, key, entry)
+            self._log_changes([(collection, key, entry)])
+            return True
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Groups many changes into a single change log write.
+        """
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    pending, self._pending_log = self._pending_log, []
+                    self._log(pending)
+
+    def mark_exported(self):
+        """
+        Records that the engine has seen every record up to now.
+        """
+        with self._lock:
+            if self.exported_seq == self.seq:
+                return
+            self.exported_seq = self.seq
+            self._log([{"exported": self.exported_seq}])
+
+    def exported(self, collection: str, key: str) -> bool:
+        """
+        Returns True if the engine has seen the current record.
+        """
+        return self.seqs[collection].get(key, self.seq + 1) <= self.exported_seq
+
+    def values(self, collection: str) -> dict:
+        """
+        Returns {key: value} of the live (not deleted) records.
+        """
+        return {
+            key: entry["value"]
+            for key, entry in self.records[collection].items()
+            if not entry["deleted"]
+        }
+
+    # ------------------------------------------------------------
+    # Hash Tree
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def _key_prefix(key: str) -> str:
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:TREE_DEPTH]
+
+    def _set(self, collection: str, key: str, entry: dict, seq: int | None = None):
+        self.records[collection][key] = entry
+        self.clock = max(self.clock, entry["clock"])
+        self.seq = max(self.seq + 1, seq or 0)
+        self.seqs[collection][key] = self.seq
+
+        prefix = self._key_prefix(key)
+        version = _version(entry)
+        self._leaves[collection].setdefault(prefix, {})[key] = f"{version[0]}:{version[1]}:{version[2]}"
+
+        for length in range(TREE_DEPTH + 1):
+            self._prefixes[collection].add(prefix[:length])
+            self._node_cache.pop((collection, prefix[:length]), None)
+
+    def node_hash(self, collection: str, prefix: str = "") -> str:
+        """
+        Returns the hash of a tree node ("" for an empty subtree).
+        """
+        cached = self._node_cache.get((collection, prefix))
+        if cached is not None:
+            return cached
+
+        if prefix not in self._prefixes[collection]:
+            return ""
+
+        if len(prefix) == TREE_DEPTH:
+            items = self._leaves[collection].get(prefix, {})
+            digest = _hash("\n".join(f"{k}={v}" for k, v in sorted(items.items())))
+        else:
+            children = self.children(collection, prefix)
+            digest = _hash("".join(f"{p}{h}" for p, h in sorted(children.items())))
+
+        self._node_cache[(collection, prefix)] = digest
+        return digest
+
+    def children(self, collection: str, prefix: str) -> dict:
+        """
+        Returns {child prefix: hash} for the non-empty children of a node.
+        """
+        result = {}
+        for digit in "0123456789abcdef":
+            child = prefix + digit
+            if child in self._prefixes[collection]:
+                result[child] = self.node_hash(collection, child)
+        return result
+
+    # ------------------------------------------------------------
+    # Peer Protocol
+    # ------------------------------------------------------------
+
+    def root(self, collection: str) -> str:
+        with self._lock:
+            return self.node_hash(collection, "")
+
+    def children_of(self, collection: str, prefixes: list) -> dict:
+        with self._lock:
+            return {p: self.children(collection, p) for p in prefixes}
+
+    def leaves(self, collection: str, prefixes: list) -> dict:
+        """
+        Returns {prefix: {key: [clock, device, hash]}} for leaf nodes.
+        """
+        with self._lock:
+            return {
+                p: {
+                    key: _version(self.records[collection][key])
+                    for key in self._leaves[collection].get(p, {})
+                }
+                for p in prefixes
+            }
+
+    def entries(self, collection: str, prefixes: list = (), keys: list = ()) -> dict:
+        """
+        Returns full entries for whole subtrees and/or single keys.
+        """
+        with self._lock:
+            result = {}
+            records = self.records[collection]
+            for prefix in prefixes:
+                for leaf, items in self._leaves[collection].items():
+                    if leaf.startswith(prefix):
+                        for key in items:
+                            result[key] = records[key]
+            for key in keys:
+                if key in records:
+                    result[key] = records[key]
+            return result
+
+    def apply(self, collection: str, entries: dict) -> int:
+        """
+        Merges entries from a peer. An entry wins if its version is
+        higher than the local one. Returns how many entries were taken.
+        """
+        with self._lock:
+            changed = []
+            for key, entry in entries.items():
+                current = self.records[collection].get(key)
+                if current is not None and _version(current) >= _version(entry):
+                    continue
+                self._set(collection, key, entry)
+                changed.append((collection, key, entry))
+
+            self._log_changes(changed)
+
+            # Rebuild the summary now rather than on the next sync request
+            self.node_hash(collection, "")
+            return len(changed)
+
+    # ------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------
+
+    def _snapshot_file(self) -> str:
+        return os.path.join(self.path, "records.json")
+
+    def _log_file(self) -> str:
+        return os.path.join(self.path, "changes.log")
+
+    def _log_changes(self, changes: list):
+        if self.path:
+            self._log([
+                {"c": collection, "k": key, "e": entry, "s": self.seqs[collection][key]}
+                for collection, key, entry in changes
+            ])
+
+    def _log(self, lines: list):
+        """
+        Appends lines to the change log, or holds them until the
+        current batch ends.
+        """
+        if not self.path or not lines:
+            return
+
+        if self._batch_depth:
+            self._pending_log.extend(lines)
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._log_file(), "a", encoding="utf-8") as f:
+            # Never append to the end of a torn line
+            if self._log_torn:
+                f.write("\n")
+                self._log_torn = False
+            f.write("".join(json.dumps(line) + "\n" for line in lines))
+        self._log_lines += len(lines)
+
+        if self._log_lines > MAX_LOG_LINES:
+            self.compact()
+
+    def load(self):
+        """
+        Loads the snapshot and replays the change log.
+        """
+        try:
+            if os.path.exists(self._snapshot_file()):
+                with open(self._snapshot_file(), "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                self.device_id = self.device_id or snapshot.get("device")
+                self.exported_seq = snapshot.get("exported_seq", 0)
+                seqs = snapshot.get("seqs", {})
+                for collection, records in snapshot.get("records", {}).items():
+                    for key, entry in records.items():
+                        self._set(collection, key, entry, seqs.get(collection, {}).get(key))
+        except Exception as e:
+            logging.error("Failed to load sync store %s: %s", self.path, e)
+
+        if not os.path.exists(self._log_file()):
+            return
+
+        try:
+            with open(self._log_file(), "r", encoding="utf-8") as f:
+                for line in f:
+                    self._log_torn = not line.endswith("\n")
+                    if not line.strip():
+                        continue
+                    self._log_lines += 1
+                    # A crash mid-append leaves a torn line; skip just
+                    # that line and keep replaying the rest
+                    try:
+                        change = json.loads(line)
+                        if "exported" in change:
+                            self.exported_seq = change["exported"]
+                            continue
+                        collection, key, entry = change["c"], change["k"], change["e"]
+                        if collection not in self.records:
+                            raise KeyError(collection)
+                        _version(entry)
+                    except (ValueError, KeyError, TypeError) as e:
+                        logging.warning("Skipping bad change log line in %s: %s", self.path, e)
+                        continue
+                    self._set(collection, key, entry, change.get("s"))
+        except OSError as e:
+            logging.error("Failed to read change log %s: %s", self.path, e)
+
+    def compact(self):
+        """
+        Folds the change log into the snapshot.
+        """
+        if not self.path:
+            return
+
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            tmp_file = self._snapshot_file() + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({
+                    "device": self.device_id,
+                    "exported_seq": self.exported_seq,
+                    "seqs": self.seqs,
+                    "records": self.records,
+                }, f)
+            os.replace(tmp_file, self._snapshot_file())
+            open(self._log_file(), "w").close()
+            self._log_lines = 0
+
+
+# ------------------------------------------------------------
+# Peers
+# ------------------------------------------------------------
+
+class SyncPeer:
+    """
+    Base class for the other side of a sync. Subclasses implement
+    _call(), which sends a JSON request and returns the JSON reply.
+    """
+
+    def __init__(self):
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.requests = 0
+
+    def _call(self, method: str, **args):
+        raise NotImplementedError
+
+    def root(self, collection):
+        return self._call("root", collection=collection)
+
+    def children_of(self, collection, prefixes):
+        return self._call("children_of", collection=collection, prefixes=prefixes)
+
+    def leaves(self, collection, prefixes):
+        return self._call("leaves", collection=collection, prefixes=prefixes)
+
+    def entries(self, collection, prefixes=(), keys=()):
+        return self._call("entries", collection=collection, prefixes=list(prefixes), keys=list(keys))
+
+    def apply(self, collection, entries):
+        return self._call("apply", collection=collection, entries=entries)
+
+
+# Methods a peer may call on a remote store
+_PEER_METHODS = {"root", "children_of", "leaves", "entries", "apply"}
+
+
+def _dispatch(store: SyncStore, request: dict):
+    method = request.get("method")
+    if method not in _PEER_METHODS:
+        raise SyncError(f"Unknown sync method: {method}")
+    return getattr(store, method)(**request.get("args", {}))
+
+
+class LocalPeer(SyncPeer):
+    """
+    Another profile in the same process (e.g. loaded from disk).
+    Requests go through JSON so transfer sizes match a remote peer.
+    """
+
+    def __init__(self, store: SyncStore):
+        super().__init__()
+        self.store = store
+
+    def _call(self, method: str, **args):
+        request = json.dumps({"method": method, "args": args})
+        reply = json.dumps(_dispatch(self.store, json.loads(request)))
+        self.requests += 1
+        self.bytes_sent += len(request)
+        self.bytes_received += len(reply)
+        return json.loads(reply)
+
+
+class HttpPeer(SyncPeer):
+    """
+    A store served by SyncServer.
+    """
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        super().__init__()
+        self.url = url
+        self.timeout = timeout
+
+    def _call(self, method: str, **args):
+        body = json.dumps({"method": method, "args": args}).encode("utf-8")
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                reply = response.read()
+        except (urllib.error.URLError, OSError) as e:
+            raise SyncError(f"Sync request '{method}' failed: {e}") from e
+
+        self.requests += 1
+        self.bytes_sent += len(body)
+        self.bytes_received += len(reply)
+        return json.loads(reply.decode("utf-8"))
+
+
+class SyncServer(http.server.ThreadingHTTPServer):
+    """
+    Minimal HTTP sync server exposing one store, e.g.:
+
+        server = SyncServer(store, ("127.0.0.1", 0))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    """
+
+    daemon_threads = True
+
+    def __init__(self, store: SyncStore, address=("127.0.0.1", 0)):
+        self.store = store
+        super().__init__(address, _SyncRequestHandler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/sync"
+
+
+class _SyncRequestHandler(http.server.BaseHTTPRequestHandler):
+    # Replies are tiny; don't let Nagle's algorithm delay them
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length).decode("utf-8"))
+            body = json.dumps(_dispatch(self.server.store, request)).encode("utf-8")
+            status = 200
+        except Exception as e:
+            logging.error("Sync request failed: %s", e)
+            body = json.dumps({"error": str(e)}).encode("utf-8")
+            status = 400
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# ------------------------------------------------------------
+# Sync
+# ------------------------------------------------------------
+
+def sync_stores(local: SyncStore, peer: SyncPeer, collections=COLLECTIONS) -> dict:
+    """
+    Two-way sync of local with peer. Only differing branches of the
+    hash tree are walked and only differing records are transferred.
+    Returns statistics about the exchange.
+    """
+    stats = {"pulled": 0, "pushed": 0}
+
+    for collection in collections:
+        if local.root(collection) == peer.root(collection):
+            continue
+
+        pull_prefixes, push_prefixes = [], []
+        pull_keys, push_keys = [], []
+
+        # Walk both trees level by level, one request per level
+        pending = [""]
+        while pending and len(pending[0]) < TREE_DEPTH:
+            remote = peer.children_of(collection, pending)
+            next_level = []
+            for prefix in pending:
+                mine = local.children(collection, prefix)
+                theirs = remote.get(prefix, {})
+                for child in sorted(set(mine) | set(theirs)):
+                    if child not in mine:
+                        pull_prefixes.append(child)
+                    elif child not in theirs:
+                        push_prefixes.append(child)
+                    elif mine[child] != theirs[child]:
+                        next_level.append(child)
+            pending = next_level
+
+        if pending:
+            remote = peer.leaves(collection, pending)
+            mine = local.leaves(collection, pending)
+            for prefix in pending:
+                theirs = remote.get(prefix, {})
+                ours = mine.get(prefix, {})
+                for key in set(ours) | set(theirs):
+                    if key not in ours or (key in theirs and theirs[key] > ours[key]):
+                        pull_keys.append(key)
+                    elif key not in theirs or ours[key] > theirs[key]:
+                        push_keys.append(key)
+
+        if pull_prefixes or pull_keys:
+            entries = peer.entries(collection, pull_prefixes, pull_keys)
+            stats["pulled"] += local.apply(collection, entries)
+
+        if push_prefixes or push_keys:
+            entries = local.entries(collection, push_prefixes, push_keys)
+            stats["pushed"] += peer.apply(collection, entries)
+
+    stats["requests"] = peer.requests
+    stats["bytes_sent"] = peer.bytes_sent
+    stats["bytes_received"] = peer.bytes_received
+    logging.info("Profile sync finished: %s", stats)
+    return stats
+
+
+# ------------------------------------------------------------
+# BrowserEngine Integration
+# ------------------------------------------------------------
+
+def update_store_from_engine(store: SyncStore, engine):
+    """
+    Records local edits of bookmarks, history and settings.
+    """
+    current = {
+        "bookmarks": {b["url"]: b for b in engine.bookmarks},
+        "history": {h["url"]: h for h in engine.history},
+        "settings": dict(engine.settings),
+    }
+
+    # A full local history has dropped its oldest visits to stay under
+    # the limit; those records are older than every kept visit and
+    # stay in the store rather than being deleted on every device
+    oldest_visit = None
+    if len(engine.history) >= engine.max_history:
+        oldest_visit = min(h.get("visited", 0) for h in engine.history)
+
+    # Records changed by peers since the engine last saw them are
+    # newer than the engine's copy, so they are neither overwritten
+    # nor treated as deleted
+    with store.batch():
+        for collection, values in current.items():
+            records = store.records[collection]
+            for key, value in values.items():
+                if key not in records or store.exported(collection, key):
+                    store.put(collection, key, value)
+            for key, value in store.values(collection).items():
+                if key in values or not store.exported(collection, key):
+                    continue
+                if collection == "history" and oldest_visit is not None \
+                        and value.get("visited", 0) <= oldest_visit:
+                    continue
+                store.delete(collection, key)
+
+
+def apply_store_to_engine(store: SyncStore, engine):
+    """
+    Writes merged records back into the engine. Bookmarks keep the
+    local order of existing items and new ones are appended; history is
+    the newest visits of the merged timeline, up to the engine's limit.
+    """
+    bookmarks = store.values("bookmarks")
+    ordered = [b["url"] for b in engine.bookmarks if b["url"] in bookmarks]
+    ordered += sorted(set(bookmarks) - set(ordered))
+    engine.bookmarks = [dict(bookmarks[url]) for url in ordered]
+
+    history = store.values("history")
+    timeline = sorted(history.values(), key=lambda h: (h.get("visited", 0), h["url"]))
+    engine.history = [dict(h) for h in timeline[-engine.max_history:]]
+
+    engine.settings.clear()
+    engine.settings.update(copy.deepcopy(store.values("settings")))
+
+    engine.save_bookmarks()
+    engine.save_history()
+    engine.save_settings()
+    store.mark_exported()
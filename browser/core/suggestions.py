@@ -0,0 +1,238 @@
+"""
+Suggestions
+-----------
+Remote search suggestions for the URL bar.
+
+A SuggestionProvider talks to one search engine's suggestion endpoint
+(the OpenSearch format: [query, [suggestion, ...]]). It is built to
+never block the UI thread:
+
+- Keystrokes are debounced; only the text the user pauses on is sent.
+- Each new keystroke cancels the pending request, and responses for
+  outdated text are dropped instead of being shown.
+- Responses are kept in a TTL + LRU cache keyed by prefix.
+- When a shorter prefix returned a complete list (fewer items than the
+  engine's own limit, all starting with the prefix), longer prefixes
+  are answered locally by filtering that list.
+
+Results are delivered through a callback from a worker thread; the UI
+is responsible for handing them over to its own thread.
+"""
+
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SuggestionCache:
+    """
+    A small TTL + LRU cache for suggestion lists.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def get(self, key: str):
+        """
+        Returns the cached list for key, or None if missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: list):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def longest_prefix(self, key: str):
+        """
+        Returns (prefix, value) for the longest cached prefix of key,
+        or (None, None).
+        """
+        for end in range(len(key) - 1, 0, -1):
+            value = self.get(key[:end])
+            if value is not None:
+                return key[:end], value
+        return None, None
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SuggestionProvider:
+    """
+    Debounced, cancellable suggestion fetching for one search engine.
+    """
+
+    def __init__(self, url_template: str, callback, debounce: float = 0.15,
+                 max_results: int = 10, ttl: float = 300.0, max_entries: int = 256,
+                 timeout: float = 3.0, server_limit: int | None = None):
+        """
+        url_template must contain {query}.
+        callback(text, suggestions) is called with the results for text.
+        server_limit is the most suggestions the engine ever returns;
+        without it, results are never reused for longer prefixes.
+        """
+        self.url_template = url_template
+        self.callback = callback
+        self.debounce = debounce
+        self.max_results = max_results
+        self.server_limit = server_limit
+        self.timeout = timeout
+
+        self.cache = SuggestionCache(max_entries=max_entries, ttl=ttl)
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="suggestions")
+        self._lock = threading.Lock()
+        self._timer = None
+        self._generation = 0
+        self._typed_at = {}
+
+        # Statistics
+        self.keystrokes = 0
+        self.requests_sent = 0
+        self.cache_hits = 0
+        self.latencies = []
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+
+    def request(self, text: str):
+        """
+        Called on every keystroke with the current URL bar text.
+        """
+        key = text.strip().lower()
+
+        with self._lock:
+            self.keystrokes += 1
+            self._cancel_locked()
+            if not key:
+                return
+
+            generation = self._generation
+            self._typed_at = {key: time.monotonic()}
+
+            cached = self.cache.get(key)
+            if cached is None:
+                prefix, parent = self.cache.longest_prefix(key)
+                if parent is not None and self._is_complete(prefix, parent):
+                    # The shorter prefix returned everything the server had
+                    cached = [s for s in parent if s.lower().startswith(key)]
+                    self.cache.put(key, cached)
+
+            if cached is None:
+                self._timer = threading.Timer(self.debounce, self._dispatch, (generation, key))
+                self._timer.daemon = True
+                self._timer.start()
+                return
+
+            self.cache_hits += 1
+
+        self._deliver(generation, key, cached)
+
+    def cancel(self):
+        """
+        Cancels any pending or in-flight request.
+        """
+        with self._lock:
+            self._cancel_locked()
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        """
+        Returns request counts and suggestion latency (in milliseconds).
+        Saved requests are counted against one request per keystroke.
+        """
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "keystrokes": self.keystrokes,
+            "requests_sent": self.requests_sent,
+            "requests_saved": self.keystrokes - self.requests_sent,
+            "cache_hits": self.cache_hits,
+            "cache_entries": len(self.cache),
+            "latency_mean_ms": sum(latencies) / count * 1000 if count else 0.0,
+            "latency_p50_ms": latencies[count // 2] * 1000 if count else 0.0,
+            "latency_p95_ms": latencies[min(count - 1, int(count * 0.95))] * 1000 if count else 0.0,
+        }
+
+    # ------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------
+
+    def _is_complete(self, prefix: str, suggestions: list) -> bool:
+        """
+        Returns True if suggestions is the server's full answer for
+        prefix, so longer prefixes can be filtered from it locally.
+        """
+        if self.server_limit is None or len(suggestions) >= self.server_limit:
+            return False
+
+        # Engines that also return non-prefix matches (spelling fixes,
+        # related queries) can't be filtered by prefix
+        return all(s.lower().startswith(prefix) for s in suggestions)
+
+    def _cancel_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._generation += 1
+
+    def _dispatch(self, generation: int, key: str):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._timer = None
+            self.requests_sent += 1
+        self._executor.submit(self._fetch, generation, key)
+
+    def _fetch(self, generation: int, key: str):
+        url = self.url_template.format(query=urllib.parse.quote_plus(key))
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                charset = response.headers.get_content_charset() or "utf-8"
+                data = json.loads(response.read().decode(charset, errors="replace"))
+            # Kept whole: truncating would make capped lists look complete
+            suggestions = [str(s) for s in data[1]]
+        except (urllib.error.URLError, OSError, ValueError, IndexError, TypeError) as e:
+            logging.warning("Search suggestions failed for '%s': %s", key, e)
+            return
+
+        with self._lock:
+            self.cache.put(key, suggestions)
+        self._deliver(generation, key, suggestions)
+
+    def _deliver(self, generation: int, key: str, suggestions: list):
+        with self._lock:
+            if generation != self._generation:
+                # The user kept typing; this answer is outdated
+                return
+            typed_at = self._typed_at.get(key)
+            if typed_at is not None:
+                self.latencies.append(time.monotonic() - typed_at)
+
+        try:
+            self.callback(key, suggestions[:self.max_results])
+        except Exception as e:
+            logging.error("Suggestion callback failed: %s", e)
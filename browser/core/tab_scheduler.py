@@ -0,0 +1,113 @@
+"""
+TabLoadScheduler
+----------------
+Decides when each tab is allowed to start loading.
+
+Opening many tabs at once (a bookmark folder, a restored session, or
+scripted new_tab calls) would otherwise start every page at the same
+time, and the tab the user is looking at would compete with all of them
+for bandwidth and CPU. The scheduler:
+
+- loads the active tab immediately, always
+- caps how many background tabs load at the same time, and lowers that
+  cap while the active tab is still loading
+- queues the rest in the order they were opened
+- promotes a queued tab the moment the user switches to it
+
+It does not depend on Qt: views are opaque keys and loading is done by
+the load(view, url) callable passed in by the window.
+"""
+
+import logging
+from collections import OrderedDict
+
+
+class TabLoadScheduler:
+    """
+    Queues tab navigations and limits concurrent background loads.
+    """
+
+    def __init__(self, load, max_background: int = 3, max_background_while_active: int = 1):
+        self.load = load
+        self.max_background = max_background
+        self.max_background_while_active = max_background_while_active
+
+        self.active = None
+        self.loading = set()
+
+        # view -> url, in the order the tabs were queued
+        self.queue = OrderedDict()
+
+    # ------------------------------------------------------------
+    # Events from the window
+    # ------------------------------------------------------------
+
+    def request(self, view, url: str):
+        """
+        Asks for view to navigate to url.
+        """
+        if view is self.active:
+            self.queue.pop(view, None)
+            self._start(view, url)
+            return
+
+        # A newer navigation replaces a queued one
+        self.queue.pop(view, None)
+        self.queue[view] = url
+        self._pump()
+
+    def set_active(self, view):
+        """
+        Called when the user switches tabs.
+        """
+        self.active = view
+        url = self.queue.pop(view, None)
+        if url is not None:
+            logging.info("Promoting queued tab load: %s", url)
+            self._start(view, url)
+        self._pump()
+
+    def started(self, view):
+        """
+        Called when a view starts loading, including navigations the
+        scheduler did not start (links, reloads, back/forward).
+        """
+        self.loading.add(view)
+
+    def finished(self, view):
+        """
+        Called when a view finishes loading (successfully or not).
+        """
+        self.loading.discard(view)
+        self._pump()
+
+    def discard(self, view):
+        """
+        Called when a tab is closed.
+        """
+        self.queue.pop(view, None)
+        self.loading.discard(view)
+        if view is self.active:
+            self.active = None
+        self._pump()
+
+    # ------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------
+
+    def background_loading(self) -> int:
+        return len(self.loading - {self.active})
+
+    def _capacity(self) -> int:
+        if self.active in self.loading:
+            return self.max_background_while_active
+        return self.max_background
+
+    def _start(self, view, url: str):
+        self.loading.add(view)
+        self.load(view, url)
+
+    def _pump(self):
+        while self.queue and self.background_loading() < self._capacity():
+            view, url = self.queue.popitem(last=False)
+            self._start(view, url)
@@ -8,12 +8,18 @@ Handles:
 - URL bar
 - WebEngineView
 - Integration with BrowserEngine
+- Search suggestions
+- Memory accounting (about:memory)
+- Prioritized tab loading
 - Extension hooks
 """
 
-from PyQt5.QtCore import QUrl
+import os
+
+from PyQt5.QtCore import QStringListModel, QTimer, QUrl, pyqtSignal
 from PyQt5.QtWidgets import (
     QMainWindow,
+    QCompleter,
     QToolBar,
     QAction,
     QLineEdit,
@@ -28,9 +34,17 @@ from PyQt5.QtWebEngineWidgets import QWebEngineView
 
 from .engine import BrowserEngine
 from .extension_manager import ExtensionManager
+from .memory import SESSION_TRACEMALLOC_FRAMES, MemoryMonitor
+from .tab_scheduler import TabLoadScheduler
+
+# How often tab and extension memory is sampled
+MEMORY_SAMPLE_INTERVAL_MS = 10_000
 
 
 class BrowserWindow(QMainWindow):
+    # Emitted from the suggestion worker thread, delivered on the UI thread
+    suggestions_ready = pyqtSignal(str, list)
+
     def __init__(self):
         super().__init__()
 
@@ -41,13 +55,26 @@ class BrowserWindow(QMainWindow):
         self.engine = BrowserEngine()
         self.extension_manager = ExtensionManager(self)
 
+        # Memory accounting. Session-long tracking starts before extensions
+        # load, so their load-time allocations are counted too
+        self.memory_monitor = MemoryMonitor(self)
+        if self.engine.settings.get("memory_tracking"):
+            self.memory_monitor.start_extension_tracking(SESSION_TRACEMALLOC_FRAMES)
+
         # Load extensions
         self.extension_manager.load_extensions()
 
+        # Decides when each tab may start loading
+        self.load_scheduler = TabLoadScheduler(
+            self._load_view,
+            max_background=self.engine.settings.get("max_background_loads", 3)
+        )
+
         # Tab widget for multiple tabs
         self.tabs = QTabWidget()
         self.tabs.setTabsClosable(True)
         self.tabs.tabCloseRequested.connect(self.close_tab)
+        self.tabs.currentChanged.connect(self._tab_changed)
         self.setCentralWidget(self.tabs)
 
         # Create first tab
@@ -59,6 +86,11 @@ class BrowserWindow(QMainWindow):
         # Menu bar
         self._create_menu_bar()
 
+        # Periodic memory samples
+        self.memory_timer = QTimer(self)
+        self.memory_timer.timeout.connect(self._sample_memory)
+        self.memory_timer.start(MEMORY_SAMPLE_INTERVAL_MS)
+
         # Load homepage
         self.navigate_home()
 
@@ -95,22 +127,59 @@ class BrowserWindow(QMainWindow):
         self.url_bar.returnPressed.connect(self.navigate_from_bar)
         nav.addWidget(self.url_bar)
 
+        # Search suggestions
+        self.suggestion_model = QStringListModel(self)
+        completer = QCompleter(self.suggestion_model, self)
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.url_bar.setCompleter(completer)
+
+        self.suggestions = self.engine.create_suggestion_provider(self.suggestions_ready.emit)
+        self.suggestions_ready.connect(self._show_suggestions)
+        self.url_bar.textEdited.connect(self._request_suggestions)
+
     # ------------------------------------------------------------
     # Tab Management
     # ------------------------------------------------------------
 
-    def new_tab(self):
+    def new_tab(self, url: str | None = None, background: bool = False):
         view = QWebEngineView()
-        view.urlChanged.connect(self._update_url_bar)
-        view.loadFinished.connect(self._page_loaded)
+        view.urlChanged.connect(lambda qurl, v=view: self._update_url_bar(v, qurl))
+        view.loadStarted.connect(lambda v=view: self.load_scheduler.started(v))
+        view.loadFinished.connect(lambda ok, v=view: self._page_loaded(v))
         index = self.tabs.addTab(view, "New Tab")
-        self.tabs.setCurrentIndex(index)
+        if not background:
+            self.tabs.setCurrentIndex(index)
+        if url:
+            self.load_scheduler.request(view, url)
         return view
 
+    def open_tabs(self, urls):
+        """
+        Opens several tabs in the background, e.g. a bookmark folder
+        or a restored session. They load a few at a time.
+        """
+        return [self.new_tab(url, background=True) for url in urls]
+
     def close_tab(self, index):
         if self.tabs.count() > 1:
+            view = self.tabs.widget(index)
+            self.load_scheduler.discard(view)
             self.tabs.removeTab(index)
 
+            # A closed tab must stop loading and never report a page load
+            view.urlChanged.disconnect()
+            view.loadStarted.disconnect()
+            view.loadFinished.disconnect()
+            view.stop()
+            view.deleteLater()
+
+    def _tab_changed(self, index):
+        view = self.tabs.widget(index)
+        self.load_scheduler.set_active(view)
+        if view is not None and hasattr(self, "url_bar"):
+            self._update_url_bar(view, view.url())
+        self._update_memory_tracking()
+
     @property
     def view(self):
         return self.tabs.currentWidget()
@@ -128,20 +197,54 @@ class BrowserWindow(QMainWindow):
         if not text:
             return
 
+        if text == "about:memory":
+            self.show_memory_page()
+            return
+
+        if self.suggestions is not None:
+            self.suggestions.cancel()
+
         url = self.engine.normalize_url(text)
         url = self.extension_manager.apply_url_hooks(url)
         self._navigate(url)
 
     def _navigate(self, url: str):
-        self.view.setUrl(QUrl(url))
+        self.load_scheduler.request(self.view, url)
+
+    def _load_view(self, view, url: str):
+        view.setUrl(QUrl(url))
 
     # ------------------------------------------------------------
     # UI Sync
     # ------------------------------------------------------------
 
-    def _update_url_bar(self, qurl):
+    def _update_url_bar(self, view, qurl):
+        # Background tabs must not overwrite the URL bar
+        if view is not self.view:
+            return
+
         self.url_bar.setText(qurl.toString())
         self.url_bar.setCursorPosition(0)
+        self._update_memory_tracking()
+
+    def _request_suggestions(self, text: str):
+        if self.suggestions is None:
+            return
+
+        # Addresses don't need search suggestions
+        if "://" in text or text.startswith(("localhost", "about:")):
+            self.suggestions.cancel()
+            return
+
+        self.suggestions.request(text)
+
+    def _show_suggestions(self, text: str, suggestions: list):
+        if self.url_bar.text().strip().lower() != text:
+            return
+
+        self.suggestion_model.setStringList(suggestions)
+        if suggestions:
+            self.url_bar.completer().complete()
 
     # ------------------------------------------------------------
     # Menu Bar
@@ -170,6 +273,16 @@ class BrowserWindow(QMainWindow):
         clear_history_action.triggered.connect(self.clear_history)
         history_menu.addAction(clear_history_action)
 
+        # Tools menu
+        tools_menu = menubar.addMenu('Tools')
+        memory_action = QAction('Memory Usage', self)
+        memory_action.triggered.connect(self.show_memory_page)
+        tools_menu.addAction(memory_action)
+
+        dump_memory_action = QAction('Export Memory Report', self)
+        dump_memory_action.triggered.connect(self.dump_memory_report)
+        tools_menu.addAction(dump_memory_action)
+
     def add_bookmark(self):
         url = self.view.url().toString()
         title = self.view.title() or url
@@ -186,11 +299,43 @@ class BrowserWindow(QMainWindow):
     def clear_history(self):
         self.engine.clear_history()
 
+    def show_memory_page(self):
+        # Extensions are attributed from now on, until the page is left
+        self.memory_monitor.start_extension_tracking()
+        self.memory_monitor.sample()
+        self.view.setHtml(self.memory_monitor.render_html(), QUrl("about:memory"))
+
+    def _sample_memory(self):
+        self.memory_monitor.sample()
+        # Keep an open about:memory page current
+        if self.view is not None and self.view.url() == QUrl("about:memory"):
+            self.view.setHtml(self.memory_monitor.render_html(), QUrl("about:memory"))
+
+    def _update_memory_tracking(self):
+        """
+        Keeps extension tracking on only while about:memory is the
+        current page or the memory_tracking setting asks for it.
+        """
+        if not hasattr(self, "memory_monitor"):
+            return
+
+        showing = self.view is not None and self.view.url() == QUrl("about:memory")
+        if showing or self.engine.settings.get("memory_tracking"):
+            self.memory_monitor.start_extension_tracking()
+        else:
+            self.memory_monitor.stop_extension_tracking()
+
+    def dump_memory_report(self):
+        self.memory_monitor.sample()
+        path = os.path.join(os.path.expanduser("~"), ".neodynium", "memory.json")
+        self.memory_monitor.dump_json(path)
+
     # ------------------------------------------------------------
     # Page Load Hook
     # ------------------------------------------------------------
 
-    def _page_loaded(self):
-        url = self.view.url().toString()
+    def _page_loaded(self, view):
+        self.load_scheduler.finished(view)
+        url = view.url().toString()
         self.engine.add_to_history(url)
         self.extension_manager.notify_page_loaded(url)
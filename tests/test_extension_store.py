@@ -0,0 +1,203 @@
+"""Tests for the extension store catalog client."""
+
+import functools
+import hashlib
+import http.server
+import io
+import os
+import shutil
+import sys
+import threading
+import zipfile
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from browser.core.extension_store import (  # noqa: E402
+    ExtensionStoreClient,
+    ExtensionStoreError,
+    publish_revision,
+)
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Serves a store folder over a local HTTP server."""
+    store_dir = tmp_path / "store"
+    store_dir.mkdir()
+    handler = functools.partial(_QuietHandler, directory=str(store_dir))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield store_dir, f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def _catalog(size):
+    return {
+        f"ext{i}": {
+            "name": f"Extension {i}",
+            "version": "1.0.0",
+            "description": f"Sample extension number {i} for testing",
+            "tags": ["sample", "privacy" if i % 2 else "themes"],
+            "package": f"packages/ext{i}.zip",
+            "sha256": "0" * 64,
+        }
+        for i in range(size)
+    }
+
+
+def test_refresh_downloads_only_deltas(store, tmp_path):
+    store_dir, url = store
+    catalog = _catalog(10_000)
+    publish_revision(str(store_dir), catalog)
+
+    client = ExtensionStoreClient(url, cache_dir=str(tmp_path / "cache"))
+    assert client.refresh() == 1
+    assert len(client.extensions) == 10_000
+    snapshot_bytes = client.bytes_transferred
+
+    catalog["ext5"] = dict(catalog["ext5"], version="1.0.1")
+    del catalog["ext7"]
+    publish_revision(str(store_dir), catalog)
+    assert sorted(os.listdir(store_dir / "snapshots")) == ["2.json.gz"]
+    assert not (store_dir / "index.json.tmp").exists()
+
+    # A fresh client starts from the disk cache
+    client = ExtensionStoreClient(url, cache_dir=str(tmp_path / "cache"))
+    assert client.revision == 1
+    assert client.refresh() == 2
+    assert client.extensions["ext5"]["version"] == "1.0.1"
+    assert "ext7" not in client.extensions
+    assert client.bytes_transferred < snapshot_bytes / 100
+
+    client.refresh()
+    assert client.revision == 2
+
+
+def test_missing_delta_leaves_catalog_intact(store, tmp_path):
+    store_dir, url = store
+    catalog = {"alpha": {"name": "Alpha"}, "beta": {"name": "Beta"}}
+    publish_revision(str(store_dir), catalog)
+    client = ExtensionStoreClient(url, cache_dir=str(tmp_path / "cache"))
+    client.refresh()
+
+    del catalog["beta"]
+    publish_revision(str(store_dir), catalog)
+    catalog["gamma"] = {"name": "Gamma"}
+    publish_revision(str(store_dir), catalog)
+    os.remove(store_dir / "deltas" / "3.json.gz")
+    snapshot = store_dir / "snapshots" / "3.json.gz"
+    os.rename(snapshot, str(snapshot) + ".bak")
+
+    # Neither deltas nor snapshot: the old catalog stays searchable
+    with pytest.raises(ExtensionStoreError):
+        client.refresh()
+    assert client.revision == 1
+    assert [e["id"] for e in client.search("beta")] == ["beta"]
+
+    # A missing delta falls back to the snapshot
+    os.rename(str(snapshot) + ".bak", snapshot)
+    assert client.refresh() == 3
+    assert client.search("beta") == []
+    assert [e["id"] for e in client.search("gamma")] == ["gamma"]
+
+
+def test_search_matches_prefixes_across_fields(store, tmp_path):
+    store_dir, url = store
+    publish_revision(str(store_dir), {
+        "adblocker": {"name": "AdBlocker", "description": "Blocks ads", "tags": ["privacy"]},
+        "darkmode": {"name": "Dark Mode", "description": "Dark themes for every page", "tags": ["themes"]},
+        "tracker": {"name": "Tracker Shield", "description": "Stops ad trackers", "tags": ["privacy"]},
+    })
+    client = ExtensionStoreClient(url, cache_dir=str(tmp_path / "cache"))
+    client.refresh()
+
+    assert [e["id"] for e in client.search("priv")] == ["adblocker", "tracker"]
+    assert [e["id"] for e in client.search("dark")] == ["darkmode"]
+    assert [e["id"] for e in client.search("ad")][0] == "adblocker"
+    assert client.search("privacy dark") == []
+
+
+def test_install_verifies_content_hash(store, tmp_path):
+    store_dir, url = store
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("extension.py", "class Extension:\n    pass\n")
+    package = buffer.getvalue()
+    (store_dir / "packages").mkdir()
+    (store_dir / "packages" / "hello.zip").write_bytes(package)
+
+    publish_revision(str(store_dir), {
+        "hello": {"name": "Hello", "package": "packages/hello.zip",
+                  "sha256": hashlib.sha256(package).hexdigest()},
+        "broken": {"name": "Broken", "package": "packages/hello.zip", "sha256": "0" * 64},
+    })
+    client = ExtensionStoreClient(url, cache_dir=str(tmp_path / "cache"))
+    client.refresh()
+
+    extensions_path = tmp_path / "extensions"
+    extensions_path.mkdir()
+    installed = client.install("hello", str(extensions_path))
+    assert os.path.exists(os.path.join(installed, "extension.py"))
+
+    with pytest.raises(ExtensionStoreError):
+        client.install("broken", str(extensions_path))
+    assert not (extensions_path / "broken").exists()
+
+
+def _package(source):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("extension.py", source)
+    return buffer.getvalue()
+
+
+def test_manager_refreshes_and_reinstalls(store, tmp_path, monkeypatch):
+    from browser.core.extension_manager import ExtensionManager
+
+    store_dir, url = store
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    (store_dir / "packages").mkdir()
+    ext_id = "storetest_reinstall"
+
+    def publish(version):
+        package = _package(f"class Extension:\n    version = {version}\n"
+                           "    def __init__(self, window):\n        pass\n")
+        (store_dir / "packages" / f"{version}.zip").write_bytes(package)
+        publish_revision(str(store_dir), {
+            ext_id: {"name": "Reinstall Test", "version": str(version),
+                     "package": f"packages/{version}.zip",
+                     "sha256": hashlib.sha256(package).hexdigest()},
+        })
+
+    class Engine:
+        settings = {"extension_store_url": url}
+
+    class Window:
+        engine = Engine()
+
+    manager = ExtensionManager(Window())
+    try:
+        publish(1)
+        # A fresh profile fetches the catalog on first use
+        assert [e["id"] for e in manager.search_store("reinstall")] == [ext_id]
+        manager.install_from_store(ext_id)
+
+        publish(2)
+        manager.store.refreshed_at = 0
+        manager.install_from_store(ext_id)
+
+        assert len(manager.extensions) == 1
+        assert manager.extensions[0].version == 2
+    finally:
+        shutil.rmtree(os.path.join(manager.extensions_path, ext_id), ignore_errors=True)
+        sys.modules.pop(f"browser.extensions.{ext_id}.extension", None)
+        sys.modules.pop(f"browser.extensions.{ext_id}", None)
@@ -0,0 +1,166 @@
+"""Tests for per-tab and per-extension memory accounting."""
+
+import importlib.util
+import json
+import os
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from browser.core.memory import (  # noqa: E402
+    SESSION_TRACEMALLOC_FRAMES,
+    MemoryMonitor,
+    read_process_memory,
+)
+
+requires_proc = pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="needs /proc")
+
+
+class FakeUrl:
+    def __init__(self, url):
+        self.url = url
+
+    def toString(self):
+        return self.url
+
+
+class FakeView:
+    def __init__(self, pid, url):
+        self.pid = pid
+        self._url = url
+
+    def page(self):
+        return self
+
+    def renderProcessPid(self):
+        return self.pid
+
+    def url(self):
+        return FakeUrl(self._url)
+
+
+class FakeTabs:
+    def __init__(self, views):
+        self.views = views
+
+    def count(self):
+        return len(self.views)
+
+    def widget(self, index):
+        return self.views[index]
+
+    def tabText(self, index):
+        return f"Tab {index}"
+
+
+class FakeExtensionManager:
+    def __init__(self):
+        self.extension_paths = {}
+
+
+class FakeWindow:
+    def __init__(self, views):
+        self.tabs = FakeTabs(views)
+        self.extension_manager = FakeExtensionManager()
+
+
+@requires_proc
+def test_tabs_sharing_a_renderer_are_grouped():
+    pid = os.getpid()
+    window = FakeWindow([FakeView(pid, "https://a.test/"), FakeView(pid, "https://b.test/"),
+                         FakeView(0, "about:blank")])
+    monitor = MemoryMonitor(window, history=3)
+
+    for _ in range(5):
+        sample = monitor.sample()
+
+    assert read_process_memory(pid)["rss"] > 0
+    assert len(sample["renderers"]) == 1
+    assert [tab["index"] for tab in sample["renderers"][0]["tabs"]] == [0, 1]
+    assert len(monitor.series[f"renderer:{pid}"]) == 3
+
+    window.tabs.views = []
+    monitor.sample()
+    assert f"renderer:{pid}" not in monitor.series
+
+
+def test_extension_heap_growth_is_attributed(tmp_path):
+    ext_dir = tmp_path / "hog"
+    ext_dir.mkdir()
+    (ext_dir / "extension.py").write_text(
+        "class Extension:\n"
+        "    def grow(self):\n"
+        "        self.data = [bytearray(1024) for _ in range(1000)]\n"
+    )
+    spec = importlib.util.spec_from_file_location("hog_extension", ext_dir / "extension.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    window = FakeWindow([])
+    window.extension_manager.extension_paths = {"hog": str(ext_dir)}
+    monitor = MemoryMonitor(window)
+    monitor.start_extension_tracking()
+    try:
+        extension = module.Extension()
+        extension.grow()
+        sample = monitor.sample()
+    finally:
+        monitor.stop_extension_tracking()
+
+    assert sample["extensions"]["hog"]["growth"] >= 1000 * 1024
+    assert "hog" in monitor.render_html()
+    assert not tracemalloc.is_tracing()
+
+
+def test_session_tracking_counts_load_time_allocations(tmp_path):
+    ext_dir = tmp_path / "preload"
+    ext_dir.mkdir()
+    (ext_dir / "extension.py").write_text("CACHE = [bytearray(1024) for _ in range(1000)]\n")
+
+    window = FakeWindow([])
+    monitor = MemoryMonitor(window)
+    # Started before the extension loads, as with the memory_tracking setting
+    monitor.start_extension_tracking(SESSION_TRACEMALLOC_FRAMES)
+    try:
+        spec = importlib.util.spec_from_file_location("preload_extension", ext_dir / "extension.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        window.extension_manager.extension_paths = {"preload": str(ext_dir)}
+        sample = monitor.sample()
+        page = monitor.render_html()
+    finally:
+        monitor.stop_extension_tracking()
+
+    assert sample["extensions"]["preload"]["allocated"] >= 1000 * 1024
+    assert "Allocated since tracking started" in page
+
+
+def test_extensions_are_only_sampled_while_tracking(tmp_path):
+    window = FakeWindow([])
+    window.extension_manager.extension_paths = {"hog": str(tmp_path)}
+    monitor = MemoryMonitor(window)
+
+    # tracemalloc started elsewhere doesn't make the timer take snapshots
+    tracemalloc.start()
+    try:
+        assert monitor.sample()["extensions"] == {}
+        monitor.start_extension_tracking()
+        assert "hog" in monitor.sample()["extensions"]
+        monitor.stop_extension_tracking()
+        assert monitor.sample()["extensions"] == {}
+        # ...and stopping leaves someone else's tracing alone
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_dump_json(tmp_path):
+    monitor = MemoryMonitor(FakeWindow([]))
+    monitor.sample()
+    path = tmp_path / "reports" / "memory.json"
+    monitor.dump_json(str(path))
+
+    report = json.loads(path.read_text())
+    assert set(report) == {"latest", "series"}
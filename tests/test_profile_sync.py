@@ -0,0 +1,213 @@
+"""Tests for incremental profile sync."""
+
+import threading
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from browser.core.profile_sync import (  # noqa: E402
+    HttpPeer,
+    LocalPeer,
+    SyncServer,
+    SyncStore,
+    sync_stores,
+)
+
+
+@pytest.fixture
+def server():
+    server = SyncServer(SyncStore(device_id="server"))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _bookmarks(store, count):
+    for i in range(count):
+        store.put("bookmarks", f"https://site{i}.test/", {"url": f"https://site{i}.test/", "title": f"Site {i}"})
+
+
+def test_single_edit_moves_only_a_few_kb(server):
+    local = SyncStore(device_id="laptop")
+    _bookmarks(local, 20_000)
+
+    stats = sync_stores(local, HttpPeer(server.url))
+    assert stats["pushed"] == 20_000
+    assert server.store.root("bookmarks") == local.root("bookmarks")
+
+    local.put("bookmarks", "https://site7.test/", {"url": "https://site7.test/", "title": "Renamed"})
+    peer = HttpPeer(server.url)
+    stats = sync_stores(local, peer)
+
+    assert stats["pushed"] == 1 and stats["pulled"] == 0
+    assert peer.bytes_sent + peer.bytes_received < 5_000
+    assert server.store.values("bookmarks")["https://site7.test/"]["title"] == "Renamed"
+    assert server.store.root("bookmarks") == local.root("bookmarks")
+
+
+def test_two_way_merge_is_deterministic():
+    a = SyncStore(device_id="a")
+    b = SyncStore(device_id="b")
+    _bookmarks(a, 50)
+    sync_stores(b, LocalPeer(a))
+
+    a.put("bookmarks", "https://site1.test/", {"url": "https://site1.test/", "title": "From A"})
+    b.put("bookmarks", "https://site1.test/", {"url": "https://site1.test/", "title": "From B"})
+    b.delete("bookmarks", "https://site2.test/")
+    a.put("settings", "theme", "dark")
+
+    sync_stores(a, LocalPeer(b))
+
+    for store in (a, b):
+        values = store.values("bookmarks")
+        # Same clock: the higher device id wins everywhere
+        assert values["https://site1.test/"]["title"] == "From B"
+        assert "https://site2.test/" not in values
+        assert store.values("settings") == {"theme": "dark"}
+    assert a.root("bookmarks") == b.root("bookmarks")
+
+
+def test_change_log_survives_reload(tmp_path):
+    store = SyncStore(str(tmp_path / "sync"))
+    _bookmarks(store, 10)
+    store.delete("bookmarks", "https://site3.test/")
+
+    reloaded = SyncStore(str(tmp_path / "sync"))
+    assert reloaded.device_id == store.device_id
+    assert reloaded.clock == store.clock
+    assert reloaded.root("bookmarks") == store.root("bookmarks")
+    assert len(reloaded.values("bookmarks")) == 9
+
+    reloaded.compact()
+    assert SyncStore(str(tmp_path / "sync")).root("bookmarks") == store.root("bookmarks")
+
+
+def test_torn_change_log_line_is_skipped(tmp_path):
+    path = str(tmp_path / "sync")
+    store = SyncStore(path)
+    store.put("bookmarks", "a", {"url": "a"})
+    # A crash in the middle of an append
+    with open(store._log_file(), "a", encoding="utf-8") as f:
+        f.write('{"c": "bookmarks", "k": "b", "e": {"val')
+
+    store = SyncStore(path)
+    store.put("bookmarks", "c", {"url": "c"})
+    store.put("settings", "theme", "dark")
+
+    store = SyncStore(path)
+    assert sorted(store.values("bookmarks")) == ["a", "c"]
+    assert store.values("settings") == {"theme": "dark"}
+    assert store.clock == 3
+
+
+def test_engine_profiles_sync(tmp_path, monkeypatch):
+    from browser.core.engine import BrowserEngine
+
+    monkeypatch.setenv("HOME", str(tmp_path / "laptop"))
+    laptop = BrowserEngine()
+    laptop.add_bookmark("https://a.test/", "A")
+    laptop_store = laptop.get_sync_store()
+
+    monkeypatch.setenv("HOME", str(tmp_path / "desktop"))
+    desktop = BrowserEngine()
+    desktop.add_bookmark("https://b.test/", "B")
+    desktop.add_to_history("https://b.test/")
+
+    # The laptop's bookmark reaches its store on its own sync
+    desktop.sync_profile(LocalPeer(laptop_store))
+    laptop.sync_profile(LocalPeer(desktop.get_sync_store()))
+    desktop.sync_profile(LocalPeer(laptop_store))
+
+    for engine in (laptop, desktop):
+        assert sorted(b["url"] for b in engine.get_bookmarks()) == ["https://a.test/", "https://b.test/"]
+        assert [h["url"] for h in engine.get_history()] == ["https://b.test/"]
+
+    desktop.remove_bookmark("https://b.test/")
+    desktop.sync_profile(LocalPeer(laptop_store))
+    laptop.sync_profile(LocalPeer(desktop.get_sync_store()))
+    assert [b["url"] for b in laptop.get_bookmarks()] == ["https://a.test/"]
+
+
+def _devices(tmp_path, monkeypatch):
+    """
+    Returns on(device), which switches HOME to the device's profile,
+    and start(device), which (re)starts its engine and sync store.
+    """
+    from browser.core.engine import BrowserEngine
+
+    def on(device):
+        monkeypatch.setenv("HOME", str(tmp_path / device))
+
+    def start(device):
+        on(device)
+        engine = BrowserEngine()
+        engine.get_sync_store()
+        return engine
+
+    return on, start
+
+
+def test_synced_settings_survive_restart(tmp_path, monkeypatch):
+    on, start = _devices(tmp_path, monkeypatch)
+
+    laptop = start("laptop")
+    desktop = start("desktop")
+    desktop.settings["theme"] = "dark"
+    desktop.save_settings()
+    desktop.sync_profile(LocalPeer(laptop.get_sync_store()))
+
+    laptop = start("laptop")
+    laptop.sync_profile(LocalPeer(desktop.get_sync_store()))
+    assert laptop.settings["theme"] == "dark"
+
+    laptop = start("laptop")
+    desktop = start("desktop")
+    on("laptop")
+    laptop.sync_profile(LocalPeer(desktop.get_sync_store()))
+    on("desktop")
+    desktop.sync_profile(LocalPeer(laptop.get_sync_store()))
+
+    for engine in (laptop, desktop):
+        assert engine.settings["theme"] == "dark"
+
+
+def test_history_merges_by_visit_time(tmp_path, monkeypatch):
+    on, start = _devices(tmp_path, monkeypatch)
+    laptop = start("laptop")
+    laptop.history = [{"url": f"https://laptop{i}.test/", "visited": 2 * i} for i in range(100)]
+    desktop = start("desktop")
+    desktop.history = [{"url": f"https://desktop{i}.test/", "visited": 2 * i + 1} for i in range(100)]
+
+    def sync_both():
+        on("desktop")
+        desktop.sync_profile(LocalPeer(laptop.get_sync_store()))
+        on("laptop")
+        laptop.sync_profile(LocalPeer(desktop.get_sync_store()))
+        on("desktop")
+        desktop.sync_profile(LocalPeer(laptop.get_sync_store()))
+
+    sync_both()
+    sync_both()
+
+    # Both devices show the newest 100 visits of the merged timeline...
+    newest = [url for i in range(50, 100) for url in (f"https://laptop{i}.test/", f"https://desktop{i}.test/")]
+    for engine in (laptop, desktop):
+        assert [h["url"] for h in engine.get_history()] == newest
+        # ...and the visits cut locally are not deleted anywhere
+        store = engine.get_sync_store()
+        assert len(store.values("history")) == 200
+        assert not any(entry["deleted"] for entry in store.records["history"].values())
+
+    on("laptop")
+    laptop.add_to_history("https://new.test/")
+    sync_both()
+    assert desktop.get_history()[-1]["url"] == "https://new.test/"
+    assert len(desktop.get_sync_store().values("history")) == 201
+
+    # Clearing history still syncs as a deletion
+    on("laptop")
+    laptop.clear_history()
+    sync_both()
+    assert desktop.get_history() == []
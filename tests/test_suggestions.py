@@ -0,0 +1,170 @@
+"""Tests for the asynchronous search-suggestion provider."""
+
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from browser.core.suggestions import SuggestionCache, SuggestionProvider  # noqa: E402
+
+WORDS = [
+    "neodymium", "neodymium magnet", "neodymium price", "neon", "neon genesis",
+    "network", "network drive", "new york", "news", "newton", "python", "pyqt5", "pyqtwebengine",
+]
+
+
+class SuggestServer:
+    """Local stand-in for a suggestion endpoint with injected latency."""
+
+    def __init__(self, latency=0.05, max_results=10, fuzzy=()):
+        self.latency = latency
+        self.requests = []
+        outer = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)["q"][0]
+                outer.requests.append(query)
+                time.sleep(outer.latency)
+                matches = [w for w in WORDS if w.startswith(query)] + list(fuzzy)
+                matches = matches[:max_results]
+                body = json.dumps([query, matches]).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/?q={{query}}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def server():
+    server = SuggestServer()
+    yield server
+    server.close()
+
+
+class Collector:
+    def __init__(self):
+        self.results = []
+        self.event = threading.Event()
+
+    def __call__(self, text, suggestions):
+        self.results.append((text, suggestions))
+        self.event.set()
+
+    def wait(self, timeout=2.0):
+        assert self.event.wait(timeout)
+        self.event.clear()
+        return self.results[-1]
+
+
+def _type(provider, text, delay=0.01):
+    for end in range(1, len(text) + 1):
+        provider.request(text[:end])
+        time.sleep(delay)
+
+
+def test_debounce_sends_one_request(server):
+    collector = Collector()
+    provider = SuggestionProvider(server.url, collector, debounce=0.1, max_results=2)
+    _type(provider, "neodym")
+
+    assert collector.wait() == ("neodym", ["neodymium", "neodymium magnet"])
+    assert server.requests == ["neodym"]
+    assert provider.stats()["requests_saved"] == 5
+    provider.shutdown()
+
+
+def test_outdated_responses_are_dropped(server):
+    server.latency = 0.3
+    collector = Collector()
+    provider = SuggestionProvider(server.url, collector, debounce=0.01)
+
+    provider.request("py")
+    time.sleep(0.1)  # request is in flight
+    provider.request("ne")
+
+    assert collector.wait()[0] == "ne"
+    time.sleep(0.3)
+    assert [text for text, _ in collector.results] == ["ne"]
+    # The dropped response still warms the cache
+    assert provider.cache.get("py") == ["python", "pyqt5", "pyqtwebengine"]
+    provider.shutdown()
+
+
+def test_complete_prefix_results_are_reused(server):
+    collector = Collector()
+    provider = SuggestionProvider(server.url, collector, debounce=0.01, server_limit=10)
+
+    provider.request("neo")
+    collector.wait()
+    provider.request("neod")
+    provider.request("neo")
+
+    assert collector.results[-2] == ("neod", ["neodymium", "neodymium magnet", "neodymium price"])
+    assert collector.results[-1][0] == "neo"
+    assert server.requests == ["neo"]
+    assert provider.cache_hits == 2
+    provider.shutdown()
+
+
+def test_capped_server_lists_are_not_reused():
+    # Like DuckDuckGo and Bing: at most 8 suggestions, below max_results
+    server = SuggestServer(max_results=8)
+    collector = Collector()
+    provider = SuggestionProvider(server.url, collector, debounce=0.01, server_limit=8)
+    try:
+        provider.request("ne")
+        assert len(collector.wait()[1]) == 8
+        provider.request("new")
+        assert collector.wait() == ("new", ["new york", "news", "newton"])
+        assert server.requests == ["ne", "new"]
+    finally:
+        provider.shutdown()
+        server.close()
+
+
+def test_non_prefix_suggestions_are_not_filtered_locally():
+    # Like Google: related queries that don't start with the prefix
+    server = SuggestServer(fuzzy=["magnet shop"])
+    collector = Collector()
+    provider = SuggestionProvider(server.url, collector, debounce=0.01, server_limit=10)
+    try:
+        provider.request("neo")
+        collector.wait()
+        provider.request("neod")
+        assert collector.wait()[1][-1] == "magnet shop"
+        assert server.requests == ["neo", "neod"]
+    finally:
+        provider.shutdown()
+        server.close()
+
+
+def test_cache_expires_and_evicts():
+    cache = SuggestionCache(max_entries=2, ttl=0.05)
+    cache.put("a", ["a1"])
+    cache.put("b", ["b1"])
+    cache.get("a")
+    cache.put("c", ["c1"])
+    assert cache.get("b") is None
+    assert cache.get("a") == ["a1"]
+    assert cache.longest_prefix("abc") == ("a", ["a1"])
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
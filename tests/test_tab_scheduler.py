@@ -0,0 +1,85 @@
+"""Tests for the prioritized background tab load scheduler."""
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from browser.core.tab_scheduler import TabLoadScheduler  # noqa: E402
+
+
+class Recorder:
+    def __init__(self):
+        self.loads = []
+
+    def __call__(self, view, url):
+        self.loads.append((view, url))
+
+
+def test_background_loads_are_capped():
+    loads = Recorder()
+    scheduler = TabLoadScheduler(loads, max_background=2, max_background_while_active=1)
+    scheduler.set_active("active")
+
+    for i in range(5):
+        scheduler.request(f"tab{i}", f"https://site{i}.test/")
+    assert [view for view, _ in loads.loads] == ["tab0", "tab1"]
+
+    scheduler.finished("tab0")
+    assert loads.loads[-1] == ("tab2", "https://site2.test/")
+    assert scheduler.background_loading() == 2
+
+
+def test_active_tab_loads_first_and_limits_background():
+    loads = Recorder()
+    scheduler = TabLoadScheduler(loads, max_background=3, max_background_while_active=1)
+    scheduler.set_active("active")
+    scheduler.request("active", "https://home.test/")
+
+    for i in range(3):
+        scheduler.request(f"tab{i}", f"https://site{i}.test/")
+    assert [view for view, _ in loads.loads] == ["active", "tab0"]
+
+    scheduler.finished("active")
+    assert [view for view, _ in loads.loads] == ["active", "tab0", "tab1", "tab2"]
+
+
+def test_switching_to_queued_tab_promotes_it():
+    loads = Recorder()
+    scheduler = TabLoadScheduler(loads, max_background=1)
+    scheduler.set_active("active")
+    for i in range(3):
+        scheduler.request(f"tab{i}", f"https://site{i}.test/")
+
+    scheduler.set_active("tab2")
+    assert loads.loads[-1] == ("tab2", "https://site2.test/")
+    assert list(scheduler.queue) == ["tab1"]
+
+
+def test_closed_tabs_leave_the_queue():
+    loads = Recorder()
+    scheduler = TabLoadScheduler(loads, max_background=1)
+    scheduler.set_active("active")
+    for i in range(3):
+        scheduler.request(f"tab{i}", f"https://site{i}.test/")
+
+    scheduler.discard("tab1")
+    scheduler.discard("tab0")
+    assert loads.loads[-1] == ("tab2", "https://site2.test/")
+    assert not scheduler.queue
+
+
+def test_closing_a_loading_tab_frees_its_slot_once():
+    loads = Recorder()
+    scheduler = TabLoadScheduler(loads, max_background=1)
+    scheduler.set_active("active")
+    for i in range(3):
+        scheduler.request(f"tab{i}", f"https://site{i}.test/")
+    assert scheduler.loading == {"tab0"}
+
+    scheduler.discard("tab0")
+    assert loads.loads[-1] == ("tab1", "https://site1.test/")
+
+    # A late load event from the closed tab doesn't start another load
+    scheduler.finished("tab0")
+    assert [view for view, _ in loads.loads] == ["tab0", "tab1"]
+    assert scheduler.background_loading() == 1